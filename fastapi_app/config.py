@@ -15,6 +15,9 @@ TEXT_PROCESSING_STRATEGY = os.getenv("TEXT_PROCESSING_STRATEGY", "intelligent")
 MAX_CHUNK_OVERLAP = int(os.getenv("MAX_CHUNK_OVERLAP", "200"))  # Characters to overlap between chunks
 ENABLE_CONTEXT_WARNINGS = os.getenv("ENABLE_CONTEXT_WARNINGS", "true").lower() == "true"
 
+# Download configuration
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_BYTES", str(200 * 1024 * 1024)))  # Largest PDF accepted for download
+
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -67,4 +70,5 @@ if __name__ == "__main__":
     print(f"DATABASE_PATH: {DATABASE_PATH}")
     print(f"TEXT_PROCESSING_STRATEGY: {TEXT_PROCESSING_STRATEGY}")
     print(f"MAX_CHUNK_OVERLAP: {MAX_CHUNK_OVERLAP}")
-    print(f"ENABLE_CONTEXT_WARNINGS: {ENABLE_CONTEXT_WARNINGS}") 
\ No newline at end of file
+    print(f"ENABLE_CONTEXT_WARNINGS: {ENABLE_CONTEXT_WARNINGS}")
+    print(f"MAX_PDF_BYTES: {MAX_PDF_BYTES}") 
\ No newline at end of file
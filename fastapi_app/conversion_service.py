@@ -33,11 +33,11 @@ async def convert_pdf_async(uri: str) -> Dict:
     """
     try:
         # Mark conversion as started
-        update_conversion_status(uri, conversion_started=True)
+        await asyncio.to_thread(update_conversion_status, uri, conversion_started=True)
         logger.info(f"Starting conversion for PDF: {uri}")
         
         # Get PDF info from database
-        pdf_info = get_processed_pdf(uri)
+        pdf_info = await asyncio.to_thread(get_processed_pdf, uri)
         if not pdf_info:
             raise ValueError(f"PDF not found in database: {uri}")
         
@@ -92,7 +92,8 @@ async def convert_pdf_async(uri: str) -> Dict:
         images_folder_relative = make_path_relative(str(images_folder))
         
         # Update database with successful conversion
-        update_conversion_status(
+        await asyncio.to_thread(
+            update_conversion_status,
             uri=uri,
             is_converted=True,
             text_file_path=text_file_relative,  # Store relative path
@@ -125,7 +126,7 @@ async def convert_pdf_async(uri: str) -> Dict:
         logger.error(error_msg)
         
         # Update database with error
-        update_conversion_status(uri=uri, conversion_error=error_msg)
+        await asyncio.to_thread(update_conversion_status, uri=uri, conversion_error=error_msg)
         
         return {
             "success": False,
@@ -135,25 +136,28 @@ async def convert_pdf_async(uri: str) -> Dict:
         }
 
 
-async def process_conversion_queue():
+async def iter_conversion_queue():
     """
-    Process all PDFs that are pending conversion.
-    This can be called periodically or triggered manually.
+    Process all PDFs that are pending conversion, yielding each result as soon as it is ready.
     """
     from database import get_pdfs_for_conversion
     
-    pending_pdfs = get_pdfs_for_conversion()
+    pending_pdfs = await asyncio.to_thread(get_pdfs_for_conversion)
     logger.info(f"Found {len(pending_pdfs)} PDFs pending conversion")
     
-    results = []
     for pdf_info in pending_pdfs:
-        result = await convert_pdf_async(pdf_info['uri'])
-        results.append(result)
+        yield await convert_pdf_async(pdf_info['uri'])
         
         # Add a small delay between conversions to avoid overwhelming the system
         await asyncio.sleep(1)
-    
-    return results
+
+
+async def process_conversion_queue():
+    """
+    Process all PDFs that are pending conversion.
+    This can be called periodically or triggered manually.
+    """
+    return [result async for result in iter_conversion_queue()]
 
 
 def trigger_conversion_background(uri: str):
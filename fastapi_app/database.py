@@ -1,17 +1,74 @@
 import sqlite3
 import datetime
 import hashlib
+import threading
+import queue
+import time
+import atexit
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from contextlib import contextmanager
 from config import DATABASE_PATH, get_pdf_conversion_folder
+from cachetools import TTLCache
 import os
 import shutil
 
+# Hot lookups are kept as module-level constants so every call executes the
+# identical SQL string and hits sqlite3's per-connection statement cache
+SQL_CHECK_URI_EXISTS = """
+    SELECT * FROM processed_pdfs 
+    WHERE uri_hash = ? AND is_downloaded = 1 AND status = 'success'
+"""
+SQL_CHECK_CONTENT_EXISTS = """
+    SELECT * FROM processed_pdfs 
+    WHERE content_hash = ? AND is_downloaded = 1 AND status = 'success'
+"""
+SQL_GET_PDF_BY_URI = "SELECT * FROM processed_pdfs WHERE uri = ?"
+SQL_GET_PDF_BY_ID = "SELECT * FROM processed_pdfs WHERE id = ?"
+
+# Number of prepared statements sqlite3 keeps per connection
+CACHED_STATEMENTS = 256
+
+# Rows written by the background writer for failed processing attempts. The
+# NOT EXISTS guard keeps a late error row from replacing a newer record.
+SQL_INSERT_DEFERRED_PDF = """
+    INSERT OR REPLACE INTO processed_pdfs 
+    (uri, uri_hash, content_hash, filename, file_path, file_size, content_type, is_downloaded, processed_at, status, error_message, accepts_ranges)
+    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM processed_pdfs WHERE uri = ? AND processed_at > ?)
+"""
+
+# Background writer batching: flush every 20 ms or 100 rows, whichever comes first
+WRITE_FLUSH_INTERVAL = 0.02
+WRITE_BATCH_SIZE = 100
+
+_WRITE_QUEUE = queue.SimpleQueue()
+_STOP_WRITER = object()
+_WRITER_THREAD: Optional[threading.Thread] = None
+_WRITER_LOCK = threading.Lock()
+
+# Process-wide connection, opened lazily by get_db_connection()
+_CONNECTION: Optional[sqlite3.Connection] = None
+_CONNECTION_LOCK = threading.RLock()
+
+# In-process cache of PDF records keyed by URI. Every write below
+# invalidates it; the TTL bounds staleness across worker processes.
+_PDF_META_CACHE = TTLCache(maxsize=1024, ttl=300)
+_CACHE_LOCK = threading.Lock()
+
+
+def _invalidate_cached_pdf(uri: Optional[str] = None):
+    """Drop a cached PDF record, or every cached record if no URI is given."""
+    with _CACHE_LOCK:
+        if uri is None:
+            _PDF_META_CACHE.clear()
+        else:
+            _PDF_META_CACHE.pop(uri, None)
+
 
 def init_database():
     """Initialize the SQLite database and create tables if they don't exist."""
-    with sqlite3.connect(DATABASE_PATH) as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS processed_pdfs (
@@ -77,8 +134,38 @@ def init_database():
         except sqlite3.OperationalError:
             pass
         
+        try:
+            cursor.execute("ALTER TABLE processed_pdfs ADD COLUMN accepts_ranges BOOLEAN DEFAULT FALSE")
+        except sqlite3.OperationalError:
+            pass
+        
         # Extraction tracking columns removed
         
+        # updated_at and its trigger were superseded by the version counter below
+        cursor.execute("DROP TRIGGER IF EXISTS trg_processed_pdfs_updated_at")
+        try:
+            cursor.execute("ALTER TABLE processed_pdfs DROP COLUMN updated_at")
+        except sqlite3.OperationalError:
+            pass  # Column never existed
+        
+        # Single-row change counter behind the list/stats ETags; unlike
+        # timestamps it changes on every write, however close together
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS processed_pdfs_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),            -- always the single row 1
+                version INTEGER NOT NULL                          -- bumped on every insert, update and delete
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO processed_pdfs_version (id, version) VALUES (1, 0)")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_processed_pdfs_version_{event.lower()}
+                AFTER {event} ON processed_pdfs
+                BEGIN
+                    UPDATE processed_pdfs_version SET version = version + 1 WHERE id = 1;
+                END
+            """)
+        
         # Create index on hashes for faster lookups
         try:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_uri_hash ON processed_pdfs(uri_hash)")
@@ -118,10 +205,7 @@ def check_uri_exists(uri: str) -> Optional[Dict]:
     uri_hash = hash_uri(uri)
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM processed_pdfs 
-            WHERE uri_hash = ? AND is_downloaded = 1 AND status = 'success'
-        """, (uri_hash,))
+        cursor.execute(SQL_CHECK_URI_EXISTS, (uri_hash,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
@@ -130,23 +214,40 @@ def check_content_exists(content_hash: str) -> Optional[Dict]:
     """Check if content with this hash already exists."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM processed_pdfs 
-            WHERE content_hash = ? AND is_downloaded = 1 AND status = 'success'
-        """, (content_hash,))
+        cursor.execute(SQL_CHECK_CONTENT_EXISTS, (content_hash,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
 
+def _open_connection() -> sqlite3.Connection:
+    """Open the process-wide connection and apply per-connection pragmas."""
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+    conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+    conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, avoids an fsync per commit
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")  # Checkpoint in small steps rather than one long stall
+    return conn
+
+
 @contextmanager
 def get_db_connection():
-    """Context manager for database connections."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
-    try:
-        yield conn
-    finally:
-        conn.close()
+    """Context manager for the shared database connection.
+    
+    One connection is reused for the life of the process so sqlite3's
+    prepared-statement cache survives between calls. Access is serialized
+    with a lock, and any transaction the caller left open is rolled back.
+    """
+    global _CONNECTION
+    with _CONNECTION_LOCK:
+        if _CONNECTION is None:
+            _CONNECTION = _open_connection()
+        conn = _CONNECTION
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
 
 
 def store_processed_pdf(
@@ -157,7 +258,8 @@ def store_processed_pdf(
     content_type: str = None,
     is_downloaded: bool = True,
     status: str = "success",
-    error_message: str = None
+    error_message: str = None,
+    accepts_ranges: bool = False
 ) -> int:
     """Store information about a processed PDF file."""
     uri_hash = hash_uri(uri)
@@ -171,43 +273,174 @@ def store_processed_pdf(
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO processed_pdfs 
-            (uri, uri_hash, content_hash, filename, file_path, file_size, content_type, is_downloaded, processed_at, status, error_message)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (uri, uri_hash, content_hash, filename, file_path, file_size, content_type, is_downloaded, processed_at, status, error_message, accepts_ranges)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             uri, uri_hash, content_hash, filename, file_path, file_size, content_type, 
-            is_downloaded, datetime.datetime.now(), status, error_message
+            is_downloaded, datetime.datetime.now(), status, error_message, accepts_ranges
         ))
         conn.commit()
-        return cursor.lastrowid
+    _invalidate_cached_pdf(uri)
+    return cursor.lastrowid
+
+
+def store_processed_pdf_deferred(
+    uri: str,
+    filename: str,
+    file_path: str,
+    file_size: int,
+    content_type: str = None,
+    is_downloaded: bool = False,
+    status: str = "error",
+    error_message: str = None,
+    accepts_ranges: bool = False
+):
+    """Queue a processed PDF record for the background writer.
+    
+    Meant for failed attempts, where the caller doesn't need the row id and
+    shouldn't wait on a disk write before responding.
+    """
+    _ensure_writer()
+    processed_at = datetime.datetime.now()
+    _WRITE_QUEUE.put((
+        uri, hash_uri(uri), None, filename, file_path, file_size, content_type,
+        is_downloaded, processed_at, status, error_message, accepts_ranges,
+        uri, processed_at
+    ))
+
+
+def _ensure_writer():
+    """Start the background writer thread if it isn't running yet."""
+    global _WRITER_THREAD
+    with _WRITER_LOCK:
+        if _WRITER_THREAD is None or not _WRITER_THREAD.is_alive():
+            _WRITER_THREAD = threading.Thread(target=_writer_loop, name="db-writer", daemon=True)
+            _WRITER_THREAD.start()
+
+
+def _write_batch(rows: List[tuple]):
+    """Write queued rows in a single transaction."""
+    with get_db_connection() as conn:
+        with conn:
+            conn.executemany(SQL_INSERT_DEFERRED_PDF, rows)
+    for row in rows:
+        _invalidate_cached_pdf(row[0])
+
+
+def _writer_loop():
+    """Drain the write queue, batching rows that arrive close together."""
+    stopping = False
+    while not stopping:
+        rows = []
+        item = _WRITE_QUEUE.get()
+        deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+        while True:
+            if item is _STOP_WRITER:
+                stopping = True
+                break
+            rows.append(item)
+            timeout = deadline - time.monotonic()
+            if len(rows) >= WRITE_BATCH_SIZE or timeout <= 0:
+                break
+            try:
+                item = _WRITE_QUEUE.get(timeout=timeout)
+            except queue.Empty:
+                break
+        if rows:
+            try:
+                _write_batch(rows)
+            except Exception as e:
+                print(f"Error writing {len(rows)} deferred records: {str(e)}")
+
+
+def flush_deferred_writes():
+    """Stop the background writer and synchronously write anything still queued."""
+    global _WRITER_THREAD
+    with _WRITER_LOCK:
+        if _WRITER_THREAD is not None and _WRITER_THREAD.is_alive():
+            _WRITE_QUEUE.put(_STOP_WRITER)
+            _WRITER_THREAD.join(timeout=5)
+        _WRITER_THREAD = None
+    rows = []
+    while True:
+        try:
+            item = _WRITE_QUEUE.get_nowait()
+        except queue.Empty:
+            break
+        if item is not _STOP_WRITER:
+            rows.append(item)
+    if rows:
+        _write_batch(rows)
+
+
+# Don't lose queued error records when the process exits
+atexit.register(flush_deferred_writes)
 
 
 def get_processed_pdf(uri: str) -> Optional[Dict]:
     """Retrieve information about a processed PDF by URI."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM processed_pdfs WHERE uri = ?", (uri,))
+        cursor.execute(SQL_GET_PDF_BY_URI, (uri,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
 
+def get_processed_pdf_cached(uri: str) -> Optional[Dict]:
+    """Like get_processed_pdf, but served from the in-process cache when possible."""
+    with _CACHE_LOCK:
+        record = _PDF_META_CACHE.get(uri)
+    if record is None:
+        record = get_processed_pdf(uri)
+        if record is None:
+            return None
+        with _CACHE_LOCK:
+            _PDF_META_CACHE[uri] = record
+    return dict(record)
+
+
 def get_processed_pdf_by_id(paper_id: int) -> Optional[Dict]:
     """Retrieve information about a processed PDF by ID."""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM processed_pdfs WHERE id = ?", (paper_id,))
+        cursor.execute(SQL_GET_PDF_BY_ID, (paper_id,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
 
-def get_all_processed_pdfs() -> List[Dict]:
-    """Retrieve all processed PDF records."""
+def get_all_processed_pdfs(limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+    """Retrieve processed PDF records, newest first, optionally one page at a time."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # LIMIT -1 means no limit in SQLite; id breaks ties so pages are stable
+        cursor.execute(
+            "SELECT * FROM processed_pdfs ORDER BY processed_at DESC, id DESC LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        )
+        rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
+def get_pdf_summaries(converted_only: bool = False) -> List[Dict]:
+    """Retrieve only the id, URI, filename and conversion flag of each PDF, newest first."""
+    query = "SELECT id, uri, filename, is_converted FROM processed_pdfs"
+    if converted_only:
+        query += " WHERE is_converted = 1"
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM processed_pdfs ORDER BY processed_at DESC")
+        cursor.execute(query + " ORDER BY processed_at DESC, id DESC")
         rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
 
+def count_processed_pdfs() -> int:
+    """Count all processed PDF records."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM processed_pdfs")
+        return cursor.fetchone()[0]
+
+
 def delete_processed_pdf(uri: str) -> bool:
     """Delete a processed PDF record by URI and associated files."""
     with get_db_connection() as conn:
@@ -221,45 +454,48 @@ def delete_processed_pdf(uri: str) -> bool:
             return False  # Record not found
         
         filename, file_path, text_file_path, images_folder_path = row
-        extraction_folder = get_pdf_conversion_folder(filename) / "extraction"
-        extraction_file_path = extraction_folder / "extracted_data.json"
         
         # Delete the database record
         cursor.execute("DELETE FROM processed_pdfs WHERE uri = ?", (uri,))
         deleted = cursor.rowcount > 0
-        
-        if deleted:
-            # Delete the physical files if they exist
-            try:
-                # Delete the original PDF file
-                if file_path and Path(file_path).exists():
-                    os.remove(file_path)
-                
-                # Delete the text file from conversion
-                if text_file_path and Path(text_file_path).exists():
-                    os.remove(text_file_path)
-                
-                # Delete the images folder from conversion
-                if images_folder_path and Path(images_folder_path).exists():
-                    shutil.rmtree(images_folder_path)
-                
-                # Delete the extraction file
-                if extraction_file_path and Path(extraction_file_path).exists():
-                    os.remove(extraction_file_path)
-                    # Also try to remove the extraction folder if it's empty
-                    try:
-                        extraction_folder = Path(extraction_file_path).parent
-                        if extraction_folder.exists() and extraction_folder.name == "extraction":
-                            extraction_folder.rmdir()  # Only removes if empty
-                    except OSError:
-                        pass  # Folder not empty or other issue
-                    
-            except Exception as e:
-                print(f"Warning: Could not delete some files for {uri}: {str(e)}")
-                # Continue even if file deletion fails - the DB record is already deleted
-        
         conn.commit()
-        return deleted
+    _invalidate_cached_pdf(uri)
+    
+    # Remove files after releasing the shared connection, so a large images
+    # folder does not hold up every other database call
+    if deleted:
+        extraction_folder = get_pdf_conversion_folder(filename) / "extraction"
+        extraction_file_path = extraction_folder / "extracted_data.json"
+        # Delete the physical files if they exist
+        try:
+            # Delete the original PDF file
+            if file_path and Path(file_path).exists():
+                os.remove(file_path)
+            
+            # Delete the text file from conversion
+            if text_file_path and Path(text_file_path).exists():
+                os.remove(text_file_path)
+            
+            # Delete the images folder from conversion
+            if images_folder_path and Path(images_folder_path).exists():
+                shutil.rmtree(images_folder_path)
+            
+            # Delete the extraction file
+            if extraction_file_path and Path(extraction_file_path).exists():
+                os.remove(extraction_file_path)
+                # Also try to remove the extraction folder if it's empty
+                try:
+                    extraction_folder = Path(extraction_file_path).parent
+                    if extraction_folder.exists() and extraction_folder.name == "extraction":
+                        extraction_folder.rmdir()  # Only removes if empty
+                except OSError:
+                    pass  # Folder not empty or other issue
+                
+        except Exception as e:
+            print(f"Warning: Could not delete some files for {uri}: {str(e)}")
+            # Continue even if file deletion fails - the DB record is already deleted
+    
+    return deleted
 
 
 def update_conversion_status(
@@ -298,6 +534,7 @@ def update_conversion_status(
             """, (conversion_error, uri))
         
         conn.commit()
+    _invalidate_cached_pdf(uri)
 
 
 def get_pdfs_for_conversion() -> List[Dict]:
@@ -313,6 +550,17 @@ def get_pdfs_for_conversion() -> List[Dict]:
         return [dict(row) for row in rows]
 
 
+def get_pdfs_etag() -> str:
+    """Get a cheap fingerprint of the processed_pdfs table for HTTP caching."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM processed_pdfs_version WHERE id = 1")
+        row = cursor.fetchone()
+        version = row[0] if row else 0
+        digest = hashlib.blake2s(str(version).encode()).hexdigest()[:16]
+        return f'"{digest}"'
+
+
 def get_processing_stats() -> Dict:
     """Get statistics about processed PDFs."""
     with get_db_connection() as conn:
@@ -357,41 +605,6 @@ def get_processing_stats() -> Dict:
         }
 
 
-def reset_interrupted_conversions() -> int:
-    """Find and reset conversions that were started but never completed (interrupted by server restart)."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Find PDFs that have conversion_started_at but no conversion_completed_at and is_converted = 0
-        # These are conversions that were interrupted
-        cursor.execute("""
-            SELECT id, uri FROM processed_pdfs 
-            WHERE conversion_started_at IS NOT NULL 
-            AND conversion_completed_at IS NULL 
-            AND is_converted = 0
-            AND is_downloaded = 1 
-            AND status = 'success'
-        """)
-        
-        interrupted_conversions = cursor.fetchall()
-        
-        if interrupted_conversions:
-            # Reset the conversion status for interrupted conversions
-            cursor.execute("""
-                UPDATE processed_pdfs 
-                SET conversion_started_at = NULL, conversion_error = 'Conversion interrupted by server restart - will retry'
-                WHERE conversion_started_at IS NOT NULL 
-                AND conversion_completed_at IS NULL 
-                AND is_converted = 0
-                AND is_downloaded = 1 
-                AND status = 'success'
-            """)
-            
-            conn.commit()
-            
-        return len(interrupted_conversions)
-
-
 def update_extraction_status(
     uri: str,
     is_extracted: bool = False,
@@ -416,6 +629,28 @@ def get_pdfs_for_extraction() -> List[Dict]:
         return [dict(row) for row in rows]
 
 
-def reset_interrupted_extractions() -> int:
-    """Deprecated: extraction tracking removed."""
-    return 0
+def reset_all_interrupted() -> Tuple[int, int]:
+    """Reset interrupted conversions and extractions in a single transaction.
+    
+    Returns:
+        Tuple of (reset conversions, reset extractions)
+    """
+    with get_db_connection() as conn:
+        with conn:  # One BEGIN/COMMIT, so startup pays for a single fsync
+            cursor = conn.execute("""
+                UPDATE processed_pdfs 
+                SET conversion_started_at = NULL, conversion_error = 'Conversion interrupted by server restart - will retry'
+                WHERE conversion_started_at IS NOT NULL 
+                AND conversion_completed_at IS NULL 
+                AND is_converted = 0
+                AND is_downloaded = 1 
+                AND status = 'success'
+            """)
+            n_conv = cursor.rowcount
+            
+            # Extraction tracking columns were removed, so there is nothing to reset
+            n_ext = 0
+    
+    if n_conv:
+        _invalidate_cached_pdf()
+    return n_conv, n_ext
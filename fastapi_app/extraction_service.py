@@ -8,6 +8,7 @@ import datetime
 from llm import llm
 from llm.questions import question_list
 from llm.summarize import get_available_summary_types, get_available_sizes
+from llm.context_utils import AVAILABLE_MODELS
 from database import update_extraction_status, get_processed_pdf
 from config import (
     DATA_DIR, 
@@ -34,11 +35,11 @@ async def extract_pdf_async(uri: str) -> Dict:
     """
     try:
         # Mark extraction as started
-        update_extraction_status(uri, extraction_started=True)
+        await asyncio.to_thread(update_extraction_status, uri, extraction_started=True)
         logger.info(f"Starting extraction for PDF: {uri}")
         
         # Get PDF info from database
-        pdf_info = get_processed_pdf(uri)
+        pdf_info = await asyncio.to_thread(get_processed_pdf, uri)
         if not pdf_info:
             raise ValueError(f"PDF not found in database: {uri}")
         
@@ -99,7 +100,8 @@ async def extract_pdf_async(uri: str) -> Dict:
             json.dump(extracted_data, f, indent=2, ensure_ascii=False)
         
         # Update database with successful extraction
-        update_extraction_status(
+        await asyncio.to_thread(
+            update_extraction_status,
             uri=uri,
             is_extracted=True,
             extraction_file_path=str(extraction_file_path)
@@ -124,7 +126,7 @@ async def extract_pdf_async(uri: str) -> Dict:
         logger.error(error_msg)
         
         # Update database with error
-        update_extraction_status(uri=uri, extraction_error=error_msg)
+        await asyncio.to_thread(update_extraction_status, uri=uri, extraction_error=error_msg)
         
         return {
             "success": False,
@@ -241,25 +243,28 @@ def extract_structured_data(text_content: str, existing_graph: dict = {}, images
 #     }
 
 
-async def process_extraction_queue():
+async def iter_extraction_queue():
     """
-    Process all PDFs that are pending extraction.
-    This can be called periodically or triggered manually.
+    Process all PDFs that are pending extraction, yielding each result as soon as it is ready.
     """
     from database import get_pdfs_for_extraction
     
-    pending_pdfs = get_pdfs_for_extraction()
+    pending_pdfs = await asyncio.to_thread(get_pdfs_for_extraction)
     logger.info(f"Found {len(pending_pdfs)} PDFs pending extraction")
     
-    results = []
     for pdf_info in pending_pdfs:
-        result = await extract_pdf_async(pdf_info['uri'])
-        results.append(result)
+        yield await extract_pdf_async(pdf_info['uri'])
         
         # Add a small delay between extractions to avoid overwhelming the system
         await asyncio.sleep(1)
-    
-    return results
+
+
+async def process_extraction_queue():
+    """
+    Process all PDFs that are pending extraction.
+    This can be called periodically or triggered manually.
+    """
+    return [result async for result in iter_extraction_queue()]
 
 
 def trigger_extraction_background(uri: str):
@@ -319,34 +324,8 @@ def get_extraction_template() -> Dict:
             "description": f"Answer to: {question}"
         })
     
-    # Define models with their context sizes
-    models = [
-        {
-            "name": "deepseek-r1:14b",
-            "context_size": 131072,
-            "description": "DeepSeek R1 14B parameter model"
-        },
-        {
-            "name": "granite3.2:8b", 
-            "context_size": 131072,
-            "description": "Granite 3.2 8B parameter model"
-        },
-        {
-            "name": "phi4:14b",
-            "context_size": 16384,
-            "description": "Phi-4 14B parameter model"
-        },
-        {
-            "name": "llama3-chatqa:8b",
-            "context_size": 8192,
-            "description": "Llama 3 ChatQA 8B parameter model"
-        },
-        {
-            "name": "qwen3:14b",
-            "context_size": 40960,
-            "description": "Qwen 3 14B parameter model"
-        }
-    ]
+    # Copy the shared model definitions so callers can't mutate them
+    models = [dict(model) for model in AVAILABLE_MODELS]
     
     return {
         "fields": fields,
@@ -395,13 +374,13 @@ async def extract_pdf_selective_async(
     """
     try:
         # Mark extraction as started
-        update_extraction_status(uri, extraction_started=True)
+        await asyncio.to_thread(update_extraction_status, uri, extraction_started=True)
         logger.info(f"Starting selective extraction for PDF: {uri}")
         logger.info(f"Selected fields: {selected_fields}")
         logger.info(f"Selected models: {selected_models}")
         
         # Get PDF info from database
-        pdf_info = get_processed_pdf(uri)
+        pdf_info = await asyncio.to_thread(get_processed_pdf, uri)
         if not pdf_info:
             raise ValueError(f"PDF not found in database: {uri}")
         
@@ -464,7 +443,8 @@ async def extract_pdf_selective_async(
             json.dump(extracted_data, f, indent=2, ensure_ascii=False)
         
         # Update database with successful extraction
-        update_extraction_status(
+        await asyncio.to_thread(
+            update_extraction_status,
             uri=uri,
             is_extracted=True,
             extraction_file_path=str(extraction_file_path)
@@ -491,7 +471,7 @@ async def extract_pdf_selective_async(
         logger.error(error_msg)
         
         # Update database with error
-        update_extraction_status(uri=uri, extraction_error=error_msg)
+        await asyncio.to_thread(update_extraction_status, uri=uri, extraction_error=error_msg)
         
         return {
             "success": False,
@@ -1,18 +1,43 @@
 import tiktoken
 import re
 from typing import List, Dict, Tuple
+from types import MappingProxyType
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-# Model context limits (tokens)
-MODEL_CONTEXT_LIMITS = {
-    "granite3.2:8b": 131072,
-    "phi4:14b": 16384,
-    "deepseek-r1:14b": 131072,
-    "llama3-chatqa:8b": 8192,
-    "qwen3:14b": 40960,
-    # Default fallback
-    "default": 8000
-}
+# Models offered for extraction, with their context window sizes (tokens)
+AVAILABLE_MODELS = (
+    {
+        "name": "deepseek-r1:14b",
+        "context_size": 131072,
+        "description": "DeepSeek R1 14B parameter model"
+    },
+    {
+        "name": "granite3.2:8b",
+        "context_size": 131072,
+        "description": "Granite 3.2 8B parameter model"
+    },
+    {
+        "name": "phi4:14b",
+        "context_size": 16384,
+        "description": "Phi-4 14B parameter model"
+    },
+    {
+        "name": "llama3-chatqa:8b",
+        "context_size": 8192,
+        "description": "Llama 3 ChatQA 8B parameter model"
+    },
+    {
+        "name": "qwen3:14b",
+        "context_size": 40960,
+        "description": "Qwen 3 14B parameter model"
+    },
+)
+
+# Model context limits (tokens), read-only so it can be shared across threads
+MODEL_CONTEXT_LIMITS = MappingProxyType(
+    {m["name"]: m["context_size"] for m in AVAILABLE_MODELS}
+    | {"default": 8000}  # Default fallback
+)
 
 def get_context_limit(model: str) -> int:
     """Get the context window limit for a specific model."""
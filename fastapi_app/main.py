@@ -1,28 +1,41 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from pathlib import Path
 import json
-from processor import ProcessInputData, process_pdf
+from processor import ProcessInputData, process_pdf, close_http_client
 from database import (
-    init_database, get_all_processed_pdfs, get_processed_pdf, get_processed_pdf_by_id, delete_processed_pdf, 
+    init_database, get_all_processed_pdfs, count_processed_pdfs, get_pdf_summaries, get_processed_pdf, get_processed_pdf_by_id, delete_processed_pdf, 
     get_processing_stats, check_uri_exists, check_content_exists, hash_file_content,
-    reset_interrupted_conversions, reset_interrupted_extractions
+    reset_all_interrupted, get_pdfs_etag, get_pdfs_for_conversion
+)
+from conversion_service import convert_pdf_async
+from extraction_service import (
+    extract_pdf_async, process_extraction_queue, iter_extraction_queue, extract_pdf_selective_async,
+    get_extraction_template
 )
-from conversion_service import convert_pdf_async, process_conversion_queue
-from extraction_service import extract_pdf_async, process_extraction_queue, extract_pdf_selective_async
 from config import resolve_file_path, get_pdf_conversion_folder
 from llm.questions import question_list
 from llm.llm import model_list
 import asyncio
+import os
 from contextlib import asynccontextmanager
 
+# The extraction template is static, so build it and its lookup sets once
+_TEMPLATE = get_extraction_template()
+_FIELD_SET = frozenset(field["title"] for field in _TEMPLATE["fields"])
+_MODEL_NAMES_TUPLE = tuple(model["name"] for model in _TEMPLATE["models"])
+_MODEL_NAMES_SET = frozenset(_MODEL_NAMES_TUPLE)
+
 async def restart_interrupted_conversions():
-    """Background task to restart interrupted conversions."""
+    """Re-queue PDFs pending conversion on the conversion worker pool."""
     try:
-        results = await process_conversion_queue()
-        if results:
-            print(f"Restarted conversion for {len(results)} PDFs")
+        queued = 0
+        for pdf in await asyncio.to_thread(get_pdfs_for_conversion):
+            queued += await _enqueue_conversion(pdf['uri'])
+        if queued:
+            print(f"Re-queued {queued} PDFs for conversion")
         else:
             print("No PDFs needed conversion restart")
     except Exception as e:
@@ -40,24 +53,78 @@ async def restart_interrupted_extractions():
     except Exception as e:
         print(f"Error restarting extractions: {str(e)}")
 
+async def _conversion_worker(queue: asyncio.Queue, pending: set, waiters: dict):
+    """Convert PDFs taken from the queue, one at a time."""
+    while True:
+        uri = await queue.get()
+        try:
+            result = await convert_pdf_async(uri)
+        except Exception as e:
+            print(f"Error converting {uri}: {str(e)}")
+            result = {"success": False, "uri": uri, "error": str(e), "message": "PDF conversion failed"}
+        finally:
+            pending.discard(uri)
+            queue.task_done()
+        for waiter in waiters.pop(uri, ()):
+            if not waiter.done():
+                waiter.set_result(result)
+
+
+async def _enqueue_conversion(uri: str) -> bool:
+    """Put a URI on the conversion queue unless it is already queued or converting."""
+    pending = app.state.convert_pending
+    if uri in pending:
+        return False
+    pending.add(uri)
+    await app.state.convert_q.put(uri)
+    return True
+
+
+async def _await_conversion(uri: str) -> dict:
+    """Queue a URI for conversion (or join its queued run) and wait for the result."""
+    waiter = asyncio.get_running_loop().create_future()
+    app.state.convert_waiters.setdefault(uri, []).append(waiter)
+    await _enqueue_conversion(uri)
+    return await waiter
+
+
+async def _iter_conversion_pool():
+    """Run every PDF pending conversion through the worker pool, yielding results as they finish."""
+    pending_pdfs = await asyncio.to_thread(get_pdfs_for_conversion)
+    conversions = [_await_conversion(pdf['uri']) for pdf in pending_pdfs]
+    for conversion in asyncio.as_completed(conversions):
+        yield await conversion
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     init_database()
     
-    # Reset any conversions that were interrupted by server restart
-    interrupted_count = reset_interrupted_conversions()
+    # Bounded pool of conversion workers so bursts of uploads queue up
+    # instead of running an unbounded number of converters at once
+    app.state.convert_q = asyncio.Queue()
+    # URIs on the queue or being converted, cleared by the workers when done
+    app.state.convert_pending = set()
+    # Futures of requests waiting on a URI's conversion, resolved by the workers
+    app.state.convert_waiters = {}
+    workers = [
+        asyncio.create_task(
+            _conversion_worker(app.state.convert_q, app.state.convert_pending, app.state.convert_waiters)
+        )
+        for _ in range(os.cpu_count() or 1)
+    ]
+    
+    # Reset any conversions and extractions that were interrupted by server restart
+    interrupted_count, interrupted_extraction_count = reset_all_interrupted()
     if interrupted_count > 0:
         print(f"Reset {interrupted_count} interrupted conversions")
         
-        # Start the conversion queue processing in the background (non-blocking)
-        asyncio.create_task(restart_interrupted_conversions())
-        print("Started background task to restart interrupted conversions")
+        # Hand them to the worker pool; queueing does not wait for the conversions
+        await restart_interrupted_conversions()
     else:
         print("No interrupted conversions found")
     
-    # Reset any extractions that were interrupted by server restart
-    interrupted_extraction_count = reset_interrupted_extractions()
     if interrupted_extraction_count > 0:
         print(f"Reset {interrupted_extraction_count} interrupted extractions")
         
@@ -69,7 +136,10 @@ async def lifespan(app: FastAPI):
     
     yield
     # Shutdown
-    # Add any cleanup code here if needed
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    await close_http_client()
 
 app = FastAPI(
     title="PDF Processor API",
@@ -78,15 +148,51 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+def _not_modified(request: Request, response: Response, etag: str) -> bool:
+    """Set caching headers and report whether the client's copy is still current."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return request.headers.get("if-none-match") == etag
+
+
+def _resolve_record_paths(pdf: dict) -> dict:
+    """Resolve the stored relative file paths of a PDF record to absolute paths."""
+    for key in ('file_path', 'text_file_path', 'images_folder_path'):
+        if pdf.get(key):
+            pdf[key] = str(resolve_file_path(pdf[key]))
+    return pdf
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _wants_ndjson(request: Request) -> bool:
+    """Check whether the client asked for results streamed as NDJSON."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _ndjson_response(results, queue_name: str) -> StreamingResponse:
+    """Stream queue results as one JSON object per line as each item finishes."""
+    async def lines():
+        try:
+            async for result in results:
+                yield json.dumps(result, default=str) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            yield json.dumps({"success": False, "error": f"Error processing {queue_name} queue: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
 @app.get("/health")
 def health():
     return {"status": "ok", "database": "connected"}
 
 
 @app.post("/pdfs")
-async def process_pdf_endpoint(data: ProcessInputData, background_tasks: BackgroundTasks):
+async def process_pdf_endpoint(data: ProcessInputData):
     # Check if URI already exists and was successfully processed
-    existing_pdf = check_uri_exists(data.uri)
+    existing_pdf = await asyncio.to_thread(check_uri_exists, data.uri)
     if existing_pdf:
         return {
             "message": "PDF with this URI already exists",
@@ -96,13 +202,13 @@ async def process_pdf_endpoint(data: ProcessInputData, background_tasks: Backgro
         }
     
     # Process the PDF
-    result = process_pdf(data)
+    result = await process_pdf(data)
     
     # If PDF was successfully downloaded, check for content duplication
     if result.get("downloaded") and result.get("is_pdf") and result.get("file_path"):
-        content_hash = hash_file_content(result["file_path"])
+        content_hash = await asyncio.to_thread(hash_file_content, result["file_path"])
         if content_hash:
-            existing_content = check_content_exists(content_hash)
+            existing_content = await asyncio.to_thread(check_content_exists, content_hash)
             if existing_content:
                 # Content already exists, but with different URI
                 # Still store the new URI record but mark it as duplicate content
@@ -110,37 +216,72 @@ async def process_pdf_endpoint(data: ProcessInputData, background_tasks: Backgro
                 result["original_record"] = existing_content
                 result["message"] = "PDF content already exists with different URI"
             else:
-                # Trigger conversion in background for new unique content
-                background_tasks.add_task(convert_pdf_async, data.uri)
+                # Queue conversion in background for new unique content
+                await _enqueue_conversion(data.uri)
         else:
-            # If we can't hash the content, still trigger conversion
-            background_tasks.add_task(convert_pdf_async, data.uri)
+            # If we can't hash the content, still queue conversion
+            await _enqueue_conversion(data.uri)
     
     return result
 
 @app.get("/pdfs")
-def get_all_pdfs():
-    """Get all processed PDF records from the database."""
+def get_all_pdfs(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """Get processed PDF records from the database, optionally one page at a time."""
     try:
-        pdfs = get_all_processed_pdfs()
+        etag = get_pdfs_etag()
+        if _not_modified(request, response, etag):
+            return Response(status_code=304, headers=dict(response.headers))
+        
+        pdfs = get_all_processed_pdfs(limit=limit, offset=offset)
         
         # Resolve paths for each PDF record
         for pdf in pdfs:
-            if pdf.get('file_path'):
-                pdf['file_path'] = str(resolve_file_path(pdf['file_path']))
-            if pdf.get('text_file_path'):
-                pdf['text_file_path'] = str(resolve_file_path(pdf['text_file_path']))
-            if pdf.get('images_folder_path'):
-                pdf['images_folder_path'] = str(resolve_file_path(pdf['images_folder_path']))
+            _resolve_record_paths(pdf)
         
         return {
             "count": len(pdfs),
+            "total": len(pdfs) if limit is None and offset == 0 else count_processed_pdfs(),
             "pdfs": pdfs
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving PDFs: {str(e)}")
 
 
+# Declared before /pdfs/{uri:path} so the path route does not swallow it
+@app.get("/pdfs/summary")
+def get_pdfs_summary(request: Request, response: Response, converted: bool = False):
+    """Get just the id, URI, filename and conversion flag of each PDF, for pickers."""
+    try:
+        etag = get_pdfs_etag()
+        if _not_modified(request, response, etag):
+            return Response(status_code=304, headers=dict(response.headers))
+        
+        pdfs = get_pdf_summaries(converted_only=converted)
+        return {"count": len(pdfs), "pdfs": pdfs}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving PDFs: {str(e)}")
+
+
+# Declared before /pdfs/{uri:path} so the path route does not swallow it
+@app.get("/pdfs/id/{paper_id}")
+def get_pdf_by_id(paper_id: int):
+    """Get a specific PDF record by ID."""
+    try:
+        pdf = get_processed_pdf_by_id(paper_id)
+        if not pdf:
+            raise HTTPException(status_code=404, detail="PDF not found")
+        return _resolve_record_paths(pdf)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving PDF: {str(e)}")
+
+
 @app.get("/pdfs/{uri:path}")
 def get_pdf_by_uri(uri: str):
     """Get a specific PDF record by URI."""
@@ -150,14 +291,7 @@ def get_pdf_by_uri(uri: str):
             raise HTTPException(status_code=404, detail="PDF not found")
         
         # Resolve paths for response (convert relative to absolute)
-        if pdf.get('file_path'):
-            pdf['file_path'] = str(resolve_file_path(pdf['file_path']))
-        if pdf.get('text_file_path'):
-            pdf['text_file_path'] = str(resolve_file_path(pdf['text_file_path']))
-        if pdf.get('images_folder_path'):
-            pdf['images_folder_path'] = str(resolve_file_path(pdf['images_folder_path']))
-            
-        return pdf
+        return _resolve_record_paths(pdf)
     except HTTPException:
         raise
     except Exception as e:
@@ -178,11 +312,68 @@ def delete_pdf_by_uri(uri: str):
         raise HTTPException(status_code=500, detail=f"Error deleting PDF: {str(e)}")
 
 
+# Declared before /convert/{uri:path} so the path route does not swallow it
+@app.post("/convert/process-queue")
+async def process_conversion_queue_endpoint(request: Request):
+    """Process all PDFs that are pending conversion."""
+    if _wants_ndjson(request):
+        return _ndjson_response(_iter_conversion_pool(), "conversion")
+    try:
+        results = [result async for result in _iter_conversion_pool()]
+        return {
+            "message": f"Processed {len(results)} PDFs",
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing conversion queue: {str(e)}")
+
+
+class ConversionBatchRequest(BaseModel):
+    uris: List[str]  # URIs of downloaded PDFs to convert
+
+
+# Declared before /convert/{uri:path} so the path route does not swallow it
+@app.post("/convert/batch")
+async def convert_pdf_batch(request: ConversionBatchRequest):
+    """Queue conversion for several PDFs in one request."""
+    queued = []
+    already_converted = []
+    in_progress = []
+    rejected = []
+    try:
+        # Preserve order but queue each URI only once
+        for uri in dict.fromkeys(request.uris):
+            pdf = await asyncio.to_thread(get_processed_pdf, uri)
+            if not pdf:
+                rejected.append({"uri": uri, "detail": "PDF not found"})
+            elif not pdf.get('is_downloaded') or pdf.get('status') != 'success':
+                rejected.append({"uri": uri, "detail": "PDF must be successfully downloaded before conversion"})
+            elif pdf.get('is_converted'):
+                already_converted.append(uri)
+            elif pdf.get('conversion_started_at') and not pdf.get('conversion_error'):
+                # Started (possibly outside the queue) and neither finished nor failed
+                in_progress.append(uri)
+            elif await _enqueue_conversion(uri):
+                queued.append(uri)
+            else:
+                in_progress.append(uri)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error queueing conversions: {str(e)}")
+    
+    return {
+        "message": f"Queued {len(queued)} PDFs for conversion",
+        "queued": queued,
+        "already_converted": already_converted,
+        "in_progress": in_progress,
+        "rejected": rejected
+    }
+
+
 @app.post("/convert/{uri:path}")
 async def convert_single_pdf(uri: str):
     """Manually trigger conversion for a specific PDF."""
     try:
-        pdf = get_processed_pdf(uri)
+        pdf = await asyncio.to_thread(get_processed_pdf, uri)
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF not found")
         
@@ -192,45 +383,58 @@ async def convert_single_pdf(uri: str):
         if pdf.get('is_converted'):
             return {"message": "PDF is already converted", "pdf": pdf}
         
-        result = await convert_pdf_async(uri)
-        return result
+        # Go through the worker pool like every other conversion, so a PDF
+        # already queued or converting is not converted a second time
+        if pdf.get('conversion_started_at') and not pdf.get('conversion_error'):
+            queued = False
+        else:
+            queued = await _enqueue_conversion(uri)
+        return {
+            "message": "PDF queued for conversion" if queued else "PDF conversion is already in progress",
+            "uri": uri,
+            "status": "queued" if queued else "in_progress"
+        }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error converting PDF: {str(e)}")
 
 
-@app.post("/convert/process-queue")
-async def process_conversion_queue_endpoint():
-    """Process all PDFs that are pending conversion."""
-    try:
-        results = await process_conversion_queue()
-        return {
-            "message": f"Processed {len(results)} PDFs",
-            "results": results
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing conversion queue: {str(e)}")
-
-
 @app.get("/stats")
-def get_stats():
+def get_stats(request: Request, response: Response):
     """Get processing statistics."""
     try:
+        etag = get_pdfs_etag()
+        if _not_modified(request, response, etag):
+            return Response(status_code=304, headers=dict(response.headers))
+        
         stats = get_processing_stats()
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving stats: {str(e)}")
 
 
-
+# Declared before /extract/{paper_id} so the path route does not swallow it
+@app.post("/extract/process-queue")
+async def process_extraction_queue_endpoint(request: Request):
+    """Process all PDFs that are pending extraction."""
+    if _wants_ndjson(request):
+        return _ndjson_response(iter_extraction_queue(), "extraction")
+    try:
+        results = await process_extraction_queue()
+        return {
+            "message": f"Processed {len(results)} PDFs",
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing extraction queue: {str(e)}")
 
 
 @app.post("/extract/{paper_id}")
 async def extract_single_pdf(paper_id: int):
     """Manually trigger extraction for a specific PDF."""
     try:
-        pdf = get_processed_pdf_by_id(paper_id)
+        pdf = await asyncio.to_thread(get_processed_pdf_by_id, paper_id)
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF not found")
         
@@ -246,31 +450,14 @@ async def extract_single_pdf(paper_id: int):
         raise HTTPException(status_code=500, detail=f"Error extracting PDF: {str(e)}")
 
 
-@app.post("/extract/process-queue")
-async def process_extraction_queue_endpoint():
-    """Process all PDFs that are pending extraction."""
-    try:
-        results = await process_extraction_queue()
-        return {
-            "message": f"Processed {len(results)} PDFs",
-            "results": results
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing extraction queue: {str(e)}")
-
-
 @app.get("/extract/template")
 async def get_extraction_template_endpoint():
     """Get the extraction template structure showing available fields and models."""
-    try:
-        from extraction_service import get_extraction_template
-        return get_extraction_template()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving extraction template: {str(e)}")
+    return _TEMPLATE
 
 
 @app.get("/extract/{paper_id}")
-async def get_extraction_results(paper_id: int):
+def get_extraction_results(paper_id: int):
     """Get extraction results for a specific PDF."""
     try:
         pdf = get_processed_pdf_by_id(paper_id)
@@ -311,32 +498,26 @@ class SelectiveExtractionRequest(BaseModel):
 async def extract_selective_pdf(paper_id: int, request: SelectiveExtractionRequest):
     """Trigger selective extraction for specific fields and models."""
     try:
-        pdf = get_processed_pdf_by_id(paper_id)
+        pdf = await asyncio.to_thread(get_processed_pdf_by_id, paper_id)
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF not found")
         
         if not pdf.get('is_converted'):
             raise HTTPException(status_code=400, detail="PDF must be converted before extraction")
         
-        # Get the template to validate selected fields
-        from extraction_service import get_extraction_template
-        template = get_extraction_template()
-        
-        # Validate selected fields
-        available_fields = [field["title"] for field in template["fields"]]
-        invalid_fields = [field for field in request.selected_fields if field not in available_fields]
+        # Validate selected fields against the template
+        invalid_fields = [field for field in request.selected_fields if field not in _FIELD_SET]
         if invalid_fields:
             raise HTTPException(status_code=400, detail=f"Invalid fields selected: {invalid_fields}")
         
         # Use specified models or default to all available models
         if request.selected_models:
-            available_models = [model["name"] for model in template["models"]]
-            invalid_models = [model for model in request.selected_models if model not in available_models]
+            invalid_models = [model for model in request.selected_models if model not in _MODEL_NAMES_SET]
             if invalid_models:
                 raise HTTPException(status_code=400, detail=f"Invalid models selected: {invalid_models}")
             selected_models = request.selected_models
         else:
-            selected_models = [model["name"] for model in template["models"]]
+            selected_models = list(_MODEL_NAMES_TUPLE)
         
         # Use selective extraction
         result = await extract_pdf_selective_async(
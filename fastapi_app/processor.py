@@ -1,31 +1,169 @@
 import os
-import requests
+import asyncio
+import hashlib
+import re
+import httpx
 from urllib.parse import urlparse
 from pathlib import Path
 
 from fastapi import HTTPException
 from pydantic import BaseModel
-from database import store_processed_pdf, get_processed_pdf
-from config import DATA_DIR, get_pdf_file_path, make_path_relative, resolve_file_path
+from database import store_processed_pdf, store_processed_pdf_deferred, get_processed_pdf_cached
+from config import DATA_DIR, MAX_PDF_BYTES, get_pdf_file_path, make_path_relative, resolve_file_path
+
+
+# Shared client so repeated downloads from the same host reuse pooled
+# keep-alive connections instead of paying a TCP/TLS handshake per request.
+# The transport retries failed connection attempts.
+_CLIENT = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+    ),
+    timeout=30,
+    follow_redirects=True
+)
+
+
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections."""
+    await _CLIENT.aclose()
+
+
+# In-flight processing tasks keyed by URI, so concurrent requests for the
+# same URI share one download instead of racing on the same file
+_INFLIGHT: dict[str, asyncio.Task] = {}
+
+
+# PDF header signature, e.g. b"%PDF-1.7"
+_PDF_MAGIC = re.compile(rb'%PDF-\d\.\d')
+
+
+# Read size for streaming downloads to disk; large chunks keep the number
+# of executor round-trips per download small
+DOWNLOAD_CHUNK_SIZE = 1 << 20
 
 
 class ProcessInputData(BaseModel):
     uri: str
 
-def process_pdf(data: ProcessInputData):
+
+def _store_error(
+    uri: str,
+    error_message: str,
+    content_type: str = None,
+    file_size: int = 0,
+    accepts_ranges: bool = False
+):
+    """Queue a failed processing attempt for the background database writer."""
+    store_processed_pdf_deferred(
+        uri=uri,
+        filename="",
+        file_path="",
+        file_size=file_size,
+        content_type=content_type,
+        is_downloaded=False,
+        status="error",
+        error_message=error_message,
+        accepts_ranges=accepts_ranges
+    )
+
+
+def _parse_content_length(value: str) -> int:
+    """Parse a Content-Length header, treating missing or invalid values as 0."""
+    try:
+        return int(value or 0)
+    except ValueError:
+        return 0
+
+
+def _not_pdf_response(uri: str, content_type: str):
+    """Record a non-PDF URI and build the response for it."""
+    # Store failed attempt in database
+    _store_error(uri, "URL does not point to a PDF resource", content_type=content_type)
+    
+    return {
+        "uri": uri,
+        "is_pdf": False,
+        "message": "The URL does not point to a PDF resource",
+        "content_type": content_type
+    }
+
+
+def _too_large_response(uri: str, content_type: str, file_size: int, accepts_ranges: bool, error_message: str):
+    """Record a PDF rejected for exceeding MAX_PDF_BYTES and build the response for it."""
+    _store_error(
+        uri,
+        error_message,
+        content_type=content_type,
+        file_size=file_size,
+        accepts_ranges=accepts_ranges
+    )
+    
+    return {
+        "uri": uri,
+        "is_pdf": True,
+        "downloaded": False,
+        "file_size": file_size,
+        "message": error_message,
+        "content_type": content_type
+    }
+
+
+def _discard_partial_download(f, path: str):
+    """Close and delete a download that did not complete."""
+    f.close()
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _open_for_download(path: str):
+    """Open a file for a streamed download, hinting sequential access to the kernel."""
+    f = open(path, 'wb')
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return f
+
+
+def _filename_for_uri(uri: str, url_path: str) -> str:
+    """Build a stable on-disk filename for a URI.
+
+    The digest keeps names stable across restarts and stops two servers that
+    both serve e.g. ``paper.pdf`` from overwriting each other's file.
+    """
+    digest = hashlib.blake2b(uri.encode('utf-8'), digest_size=8).hexdigest()
+    basename = os.path.basename(url_path)
+    if basename and basename.endswith('.pdf'):
+        return f"{basename[:-4]}_{digest}.pdf"
+    return f"pdf_{digest}.pdf"
+
+async def process_pdf(data: ProcessInputData):
+    """Process a PDF URI, joining any in-flight request for the same URI."""
+    task = _INFLIGHT.get(data.uri)
+    if task is None:
+        task = asyncio.ensure_future(_process_pdf(data))
+        _INFLIGHT[data.uri] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(data.uri, None))
+    # Shield so one caller disconnecting does not cancel the shared download
+    return await asyncio.shield(task)
+
+async def _process_pdf(data: ProcessInputData):
     try:
         # Check if this PDF has already been processed
-        existing_record = get_processed_pdf(data.uri)
+        existing_record = await asyncio.to_thread(get_processed_pdf_cached, data.uri)
         if existing_record and existing_record['is_downloaded'] and existing_record['status'] == 'success':
             # Resolve the path from database (might be relative or absolute)
             resolved_path = resolve_file_path(existing_record['file_path'])
             # Check if file still exists
             if resolved_path.exists():
+                abs_path = os.fspath(resolved_path)
                 return {
                     "uri": data.uri,
                     "is_pdf": True,
                     "downloaded": True,
-                    "file_path": str(resolved_path),  # Return absolute path in response
+                    "file_path": abs_path,  # Return absolute path in response
                     "file_size": existing_record['file_size'],
                     "message": "PDF already processed and available",
                     "from_cache": True,
@@ -38,7 +176,7 @@ def process_pdf(data: ProcessInputData):
         parsed_url = urlparse(data.uri)
         
         # Make a HEAD request to check content type without downloading the full file
-        response = requests.head(data.uri, allow_redirects=True, timeout=10)
+        response = await _CLIENT.head(data.uri, timeout=10)
         response.raise_for_status()
         
         # Check if the content type indicates PDF
@@ -50,67 +188,106 @@ def process_pdf(data: ProcessInputData):
             path = parsed_url.path.lower()
             is_pdf = path.endswith('.pdf')
         
+        # If the server supports range requests, confirm the PDF magic bytes
+        # with a tiny probe before committing to the full download
+        accepts_ranges = response.headers.get('accept-ranges', '').lower() == 'bytes'
+        if is_pdf and accepts_ranges:
+            async with _CLIENT.stream('GET', data.uri, headers={'Range': 'bytes=0-7'}, timeout=5) as probe:
+                probe.raise_for_status()
+                head_bytes = await anext(probe.aiter_bytes(8), b"")
+            is_pdf = _PDF_MAGIC.match(head_bytes) is not None
+        
         if not is_pdf:
-            # Store failed attempt in database
-            store_processed_pdf(
-                uri=data.uri,
-                filename="",
-                file_path="",
-                file_size=0,
-                content_type=content_type,
-                is_downloaded=False,
-                status="error",
-                error_message="URL does not point to a PDF resource"
+            return _not_pdf_response(data.uri, content_type)
+        
+        # Reject oversized files based on the advertised size
+        content_length = _parse_content_length(response.headers.get('content-length'))
+        if content_length > MAX_PDF_BYTES:
+            return _too_large_response(
+                data.uri,
+                content_type,
+                content_length,
+                accepts_ranges,
+                f"PDF is too large ({content_length} bytes, limit is {MAX_PDF_BYTES} bytes)"
             )
-            
-            return {
-                "uri": data.uri,
-                "is_pdf": False,
-                "message": "The URL does not point to a PDF resource",
-                "content_type": content_type
-            }
         
         # Ensure data directory exists
         DATA_DIR.mkdir(exist_ok=True)
         
-        # Extract filename from URL
-        filename = os.path.basename(parsed_url.path)
-        if not filename or not filename.endswith('.pdf'):
-            filename = f"pdf_{hash(data.uri) % 10000}.pdf"
+        # Derive filename from URL, suffixed with a stable digest of the URI
+        filename = _filename_for_uri(data.uri, parsed_url.path)
         
         # Full path for the downloaded file using centralized config
         file_path = get_pdf_file_path(filename)
+        abs_path = os.fspath(file_path)
         
-        # Download the PDF
-        download_response = requests.get(data.uri, timeout=30)
-        download_response.raise_for_status()
-        
-        # Save the file
+        # Download the PDF, streaming it to disk so memory stays O(chunk)
         downloaded = False
-        with open(file_path, 'wb') as f:
-            f.write(download_response.content)
+        file_size = 0
+        async with _CLIENT.stream('GET', data.uri) as download_response:
+            download_response.raise_for_status()
+            chunks = download_response.aiter_bytes(DOWNLOAD_CHUNK_SIZE)
+            
+            # Check the magic bytes before writing anything, so mislabelled
+            # responses (e.g. HTML error pages) never reach the disk
+            first_chunk = await anext(chunks, b"")
+            if not _PDF_MAGIC.match(first_chunk):
+                return _not_pdf_response(data.uri, content_type)
+            
+            # Disk writes run in the default executor so the event loop keeps
+            # serving other requests while the file is written
+            f = await asyncio.to_thread(_open_for_download, abs_path)
+            try:
+                # Content-Length may be missing, wrong or absent (chunked
+                # responses), so enforce the cap on the bytes received
+                file_size = len(first_chunk)
+                if file_size <= MAX_PDF_BYTES:
+                    await asyncio.to_thread(f.write, first_chunk)
+                    async for chunk in chunks:
+                        file_size += len(chunk)
+                        if file_size > MAX_PDF_BYTES:
+                            break
+                        await asyncio.to_thread(f.write, chunk)
+            except BaseException:
+                # Don't leave a truncated file behind when the transfer fails
+                await asyncio.to_thread(_discard_partial_download, f, abs_path)
+                raise
+            
+            if file_size > MAX_PDF_BYTES:
+                await asyncio.to_thread(_discard_partial_download, f, abs_path)
+                return _too_large_response(
+                    data.uri,
+                    content_type,
+                    file_size,
+                    accepts_ranges,
+                    f"PDF is too large (download exceeded the limit of {MAX_PDF_BYTES} bytes)"
+                )
+            
+            await asyncio.to_thread(f.close)
             downloaded = True
         
         # Store relative path in database for portability
-        relative_path = make_path_relative(str(file_path))
+        relative_path = make_path_relative(abs_path)
         
         # Store successful processing in database
-        db_id = store_processed_pdf(
+        db_id = await asyncio.to_thread(
+            store_processed_pdf,
             uri=data.uri,
             filename=filename,
             file_path=relative_path,  # Store relative path
-            file_size=len(download_response.content),
+            file_size=file_size,
             content_type=content_type,
             is_downloaded=downloaded,
-            status="success"
+            status="success",
+            accepts_ranges=accepts_ranges
         )
         
         return {
             "uri": data.uri,
             "is_pdf": True,
             "downloaded": downloaded,
-            "file_path": str(file_path),  # Return absolute path in response
-            "file_size": len(download_response.content),
+            "file_path": abs_path,  # Return absolute path in response
+            "file_size": file_size,
             "message": "PDF successfully downloaded and queued for conversion",
             "database_id": db_id,
             "from_cache": False,
@@ -118,27 +295,11 @@ def process_pdf(data: ProcessInputData):
             "conversion_status": "queued"
         }
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Store failed attempt in database
-        store_processed_pdf(
-            uri=data.uri,
-            filename="",
-            file_path="",
-            file_size=0,
-            is_downloaded=False,
-            status="error",
-            error_message=f"Error accessing URL: {str(e)}"
-        )
+        _store_error(data.uri, f"Error accessing URL: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error accessing URL: {str(e)}")
     except Exception as e:
         # Store failed attempt in database
-        store_processed_pdf(
-            uri=data.uri,
-            filename="",
-            file_path="",
-            file_size=0,
-            is_downloaded=False,
-            status="error",
-            error_message=f"Error processing request: {str(e)}"
-        )
+        _store_error(data.uri, f"Error processing request: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}") 
\ No newline at end of file
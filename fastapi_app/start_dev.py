@@ -23,7 +23,9 @@ def main():
         "--reload-exclude", "*.db",
         "--reload-exclude", "__pycache__/*",
         "--host", "0.0.0.0",
-        "--port", "8000"
+        "--port", "8000",
+        "--loop", "uvloop",
+        "--http", "httptools"
     ]
     
     print("Starting FastAPI development server with hot reload...")
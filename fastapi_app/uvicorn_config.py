@@ -19,6 +19,8 @@ def main():
         "--reload-exclude", "__pycache__/*",
         "--reload-exclude", "*.pyc",
         "--reload-exclude", "*.pyo",
+        "--loop", "uvloop",
+        "--http", "httptools",
         "--log-level", "info"
     ]
     
@@ -1,96 +1,398 @@
 import streamlit as st
-import requests
+import httpx
 import pandas as pd
+import numpy as np
+import os
+import json
+import atexit
+import threading
+import time
+import functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 LEGACY_PREFIX = "downloaded_pdf_"
 
+# Status labels for the PDF table; columns store indexes into these as categoricals
+STATUS_LABELS = ("✅ Success", "❌ Error")
+DOWNLOADED_LABELS = ("✅ Yes", "❌ No")
+CONVERSION_LABELS = ("⏳ Pending", "✅ Converted", "❌ Failed", "🔄 Converting")
+
 
 def clean_filename(filename: str) -> str:
     """Remove the legacy prefix from filenames for display."""
-    if filename and filename.startswith(LEGACY_PREFIX):
-        return filename[len(LEGACY_PREFIX):]
-    return filename
+    return filename.removeprefix(LEGACY_PREFIX) if filename else filename
+
+
+def _truthy(column: pd.Series) -> pd.Series:
+    """Vectorized truthiness of an API column, treating missing values as false."""
+    return column.notna() & column.astype(bool)
+
+
+def build_pdf_table(pdfs) -> pd.DataFrame:
+    """Build the PDF list table with vectorized column operations."""
+    raw = pd.DataFrame.from_records(pdfs).reindex(columns=[
+        "id", "uri", "filename", "file_size", "status", "is_downloaded",
+        "is_converted", "conversion_error", "conversion_started_at", "processed_at"
+    ])
+    uri = raw["uri"].fillna("")
+    is_converted = _truthy(raw["is_converted"])
+    conversion_failed = _truthy(raw["conversion_error"])
+    conversion_started = _truthy(raw["conversion_started_at"])
+    
+    return pd.DataFrame({
+        "ID": raw["id"].fillna(""),
+        "URI": uri.str.slice(0, 50) + np.where(uri.str.len() > 50, "...", ""),
+        "Filename": raw["filename"].fillna("").str.removeprefix(LEGACY_PREFIX),
+        "File Size (KB)": (raw["file_size"].fillna(0) / 1024).round(2),
+        "Status": pd.Categorical.from_codes(
+            np.where(raw["status"] == "success", 0, 1), categories=STATUS_LABELS
+        ),
+        "Downloaded": pd.Categorical.from_codes(
+            np.where(_truthy(raw["is_downloaded"]), 0, 1), categories=DOWNLOADED_LABELS
+        ),
+        "Converted": pd.Categorical.from_codes(
+            np.select([conversion_failed, conversion_started & ~is_converted, is_converted], [2, 3, 1], default=0),
+            categories=CONVERSION_LABELS
+        ),
+        "Processed At": raw["processed_at"].fillna("").str.slice(0, 19)
+    })
 
 st.set_page_config(page_title="PDF Processor", page_icon="📄", layout="wide")
 
 st.title("📄 PDF Processor Dashboard")
 
+# Show notifications queued before the last rerun
+if "toast" in st.session_state:
+    st.toast(st.session_state.pop("toast"))
+
 # API base URL
 API_BASE_URL = "http://localhost:8000"
 
-def get_all_pdfs():
+# Rows per page on the PDF List page
+PDF_PAGE_SIZE = 50
+
+# Long-running API calls (downloads, conversions, extractions) wait as long as they need
+NO_TIMEOUT = None
+
+@st.cache_resource
+def get_http():
+    """API client shared across reruns so calls reuse keep-alive connections."""
+    client = httpx.Client(
+        base_url=API_BASE_URL,
+        timeout=10.0,
+        # Limits go on the transport; the client ignores them when given a transport
+        transport=httpx.HTTPTransport(
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+        )
+    )
+    atexit.register(client.close)
+    return client
+
+@st.cache_resource
+def get_inflight():
+    """GET requests still waiting for a response, keyed by path and arguments, and the lock guarding them."""
+    return {}, threading.Lock()
+
+@st.cache_resource
+def get_request_executor():
+    """Thread pool that sends deduplicated GET requests."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-get")
+
+def get_once(path, **kwargs):
+    """GET an API path, sharing the response of an identical request that is already in flight."""
+    key = (path, json.dumps(kwargs, sort_keys=True, default=str))
+    inflight, lock = get_inflight()
+    # Shared by every session, so lookup and submit must be one atomic step
+    with lock:
+        future = inflight.get(key)
+        submitted = future is None or future.done()
+        if submitted:
+            future = get_request_executor().submit(get_http().get, path, **kwargs)
+            inflight[key] = future
+    # Outside the lock: the callback runs inline if the request already finished
+    if submitted:
+        future.add_done_callback(functools.partial(_forget_request, inflight, lock, key))
+    return future.result()
+
+def _forget_request(inflight, lock, key, future):
+    """Drop a finished request from the in-flight map unless a newer one replaced it."""
+    with lock:
+        if inflight.get(key) is future:
+            del inflight[key]
+
+# Cached fetchers raise on failure so errors are never memoized; the
+# wrappers below turn failures into UI messages.
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_all_pdfs(limit=None, offset=0):
+    params = {"limit": limit, "offset": offset} if limit else None
+    response = get_once("/pdfs", params=params)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_converted_pdf_summaries():
+    response = get_once("/pdfs/summary", params={"converted": "true"})
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_pdf(paper_id):
+    response = get_once(f"/pdfs/id/{paper_id}")
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_stats():
+    response = get_once("/stats")
+    response.raise_for_status()
+    return response.json()
+
+# The template is static backend configuration, so one shared copy per
+# process is enough; callers must treat it as read-only
+@st.cache_resource(show_spinner=False)
+def extraction_template():
+    response = get_once("/extract/template", timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_resource
+def get_executor():
+    """Thread pool shared across reruns for overlapping independent API calls."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="api")
+
+def fetch_concurrently(*fetchers):
+    """Start independent fetchers in parallel and return their futures in order.
+    
+    Hand each future's result method to a getter, which applies call_with_backoff.
+    """
+    ctx = get_script_run_ctx()
+    wait_for_backoff()
+
+    def run(fetch):
+        # Attach the session context so cached fetchers work off the script thread
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch()
+
+    executor = get_executor()
+    return [executor.submit(run, fetch) for fetch in fetchers]
+
+# Cleared with the PDF caches, so triggering or refreshing an extraction
+# drops stale results; the TTL bounds extractions finished elsewhere
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_extraction_results(paper_id):
+    response = get_once(f"/extract/{paper_id}")
+    response.raise_for_status()
+    return response.json()
+
+def wait_for_backoff():
+    """Sleep until the backoff set by the last HTTP 429 response has passed."""
+    delay = st.session_state.get("retry_at", 0) - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+def call_with_backoff(fetch):
+    """Run an API fetcher, backing off exponentially after HTTP 429 responses."""
+    wait_for_backoff()
+    try:
+        result = fetch()
+    except httpx.HTTPStatusError as e:
+        if e.response is not None and e.response.status_code == 429:
+            attempts = st.session_state.get("rate_limited", 0) + 1
+            st.session_state["rate_limited"] = attempts
+            st.session_state["retry_at"] = time.monotonic() + min(0.5 * 2 ** (attempts - 1), 8)
+        raise
+    st.session_state.pop("rate_limited", None)
+    return result
+
+def safe_rerun(min_interval=0.5):
+    """Rerun the app unless it was already rerun within the last min_interval seconds."""
+    now = time.monotonic()
+    if now - st.session_state.get("last_rerun", 0) < min_interval:
+        return
+    st.session_state["last_rerun"] = now
+    st.rerun()
+
+def clear_pdf_caches():
+    """Drop cached PDF lists, statistics and extraction results after a change or manual refresh."""
+    fetch_all_pdfs.clear()
+    fetch_converted_pdf_summaries.clear()
+    fetch_pdf.clear()
+    fetch_stats.clear()
+    fetch_extraction_results.clear()
+    st.session_state.pop("pdf_payload", None)
+    st.session_state.pop("pdf_df", None)
+
+def add_processed_pdf(result):
+    """Insert a newly processed PDF into the stored first page instead of refetching the list."""
+    fetch_all_pdfs.clear()
+    fetch_stats.clear()
+    
+    payload = st.session_state.get("pdf_payload")
+    if payload is None or st.session_state.get("pdf_page") != 1:
+        st.session_state.pop("pdf_payload", None)
+        st.session_state.pop("pdf_df", None)
+        return
+    
+    filename = os.path.basename(result.get("file_path") or "")
+    record = {
+        "id": result.get("database_id"),
+        "uri": result.get("uri"),
+        "filename": filename,
+        "file_path": result.get("file_path"),
+        "file_size": result.get("file_size", 0),
+        "status": "success",
+        "is_downloaded": result.get("downloaded", False),
+        "is_converted": result.get("is_converted", False),
+        "is_extracted": False,
+        "processed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "_clean": clean_filename(filename)
+    }
+    # Re-processing a URI replaces its old row (with a new id) rather than adding one
+    others = [pdf for pdf in payload["pdfs"] if pdf.get("uri") != record["uri"]]
+    replaced = len(others) < len(payload["pdfs"])
+    
+    # Newest first, so the record leads page one and the last row moves to page two
+    pdfs = [record] + others[:PDF_PAGE_SIZE - 1]
+    st.session_state["pdf_payload"] = {
+        **payload,
+        "pdfs": pdfs,
+        "count": len(pdfs),
+        "total": payload.get("total", payload["count"]) + (0 if replaced else 1)
+    }
+    st.session_state["pdf_df"] = build_pdf_table(pdfs)
+
+def get_all_pdfs(fetch=fetch_all_pdfs):
     """Fetch all processed PDFs from the API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/pdfs")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Error fetching PDFs: {response.status_code}")
-            return None
-    except requests.exceptions.RequestException as e:
+        return call_with_backoff(fetch)
+    except httpx.HTTPStatusError as e:
+        st.error(f"Error fetching PDFs: {e.response.status_code}")
+        return None
+    except httpx.HTTPError as e:
+        st.error(f"Connection error: {str(e)}")
+        return None
+
+def get_pdf(paper_id):
+    """Fetch a single PDF record by ID from the API."""
+    try:
+        return call_with_backoff(lambda: fetch_pdf(paper_id))
+    except httpx.HTTPStatusError as e:
+        st.error(f"Error fetching PDF: {e.response.status_code}")
+        return None
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {str(e)}")
         return None
 
 def get_stats():
     """Fetch processing statistics from the API."""
     try:
-        response = requests.get(f"{API_BASE_URL}/stats")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
-    except requests.exceptions.RequestException:
+        return call_with_backoff(fetch_stats)
+    except httpx.HTTPError:
         return None
 
+def fire_and_forget(method, url, **kwargs):
+    """Send an API request on a background thread without waiting for the response."""
+    http = get_http()
+
+    def send():
+        try:
+            http.request(method, url, timeout=NO_TIMEOUT, **kwargs)
+        except httpx.HTTPError:
+            # Failures surface as error states in the PDF list on the next refresh
+            pass
+
+    threading.Thread(target=send, daemon=True).start()
+
+def queue_toast(message):
+    """Show a toast after the next rerun."""
+    st.session_state["toast"] = message
+
 def trigger_conversion(uri):
-    """Trigger conversion for a specific PDF."""
+    """Trigger conversion for a specific PDF without waiting for it to finish."""
+    fire_and_forget("POST", f"/convert/{uri}")
+
+def trigger_conversion_batch(uris):
+    """Queue conversion for several PDFs with a single request."""
     try:
-        response = requests.post(f"{API_BASE_URL}/convert/{uri}")
-        return response
-    except requests.exceptions.RequestException as e:
+        return get_http().post("/convert/batch", json={"uris": uris})
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {str(e)}")
         return None
 
+def stage_conversion(uri):
+    """Button callback that adds a PDF to the pending conversion batch."""
+    st.session_state.setdefault("convert_batch", []).append(uri)
+
 def delete_pdf(uri):
     """Delete a PDF record by URI."""
     try:
-        response = requests.delete(f"{API_BASE_URL}/pdfs/{uri}")
+        response = get_http().delete(f"/pdfs/{uri}")
         return response
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {str(e)}")
         return None
 
 def trigger_extraction(paper_id):
-    """Trigger extraction for a specific PDF."""
-    try:
-        response = requests.post(f"{API_BASE_URL}/extract/{paper_id}")
-        return response
-    except requests.exceptions.RequestException as e:
-        st.error(f"Connection error: {str(e)}")
-        return None
+    """Trigger extraction for a specific PDF without waiting for it to finish."""
+    fire_and_forget("POST", f"/extract/{paper_id}")
 
 def get_extraction_results(paper_id):
     """Get extraction results for a specific PDF."""
     try:
-        response = requests.get(f"{API_BASE_URL}/extract/{paper_id}")
-        return response
-    except requests.exceptions.RequestException as e:
+        return call_with_backoff(lambda: fetch_extraction_results(paper_id))
+    except httpx.HTTPStatusError:
+        return None
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {str(e)}")
         return None
 
-def get_extraction_template():
+def load_pdf_list(page_num):
+    """Return one page of the PDF list and its table, reusing the copy kept in session state."""
+    if "pdf_df" not in st.session_state or st.session_state.get("pdf_page") != page_num:
+        offset = (page_num - 1) * PDF_PAGE_SIZE
+        pdf_data = get_all_pdfs(functools.partial(fetch_all_pdfs, PDF_PAGE_SIZE, offset))
+        if not pdf_data or not pdf_data.get("pdfs"):
+            return pdf_data, None
+        
+        # Clean each filename once for the selectbox, details and delete views
+        for pdf in pdf_data["pdfs"]:
+            pdf["_clean"] = clean_filename(pdf.get("filename", "Unknown"))
+        
+        st.session_state["pdf_payload"] = pdf_data
+        st.session_state["pdf_df"] = build_pdf_table(pdf_data["pdfs"])
+        st.session_state["pdf_page"] = page_num
+    return st.session_state["pdf_payload"], st.session_state["pdf_df"]
+
+def get_extraction_template(fetch=extraction_template):
     """Get the extraction template structure."""
     try:
-        response = requests.get(f"{API_BASE_URL}/extract/template")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
-    except requests.exceptions.RequestException as e:
+        return call_with_backoff(fetch)
+    except httpx.HTTPStatusError:
+        return None
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {str(e)}")
         return None
 
+# Keyed by the serialized fields so a reloaded template is partitioned
+# again; cache_resource hands back the same read-only objects without
+# the copy cache_data would make on every rerun
+@st.cache_resource(show_spinner=False)
+def partition_fields(fields_json):
+    """Split template fields into summary and question fields and their title sets."""
+    fields = json.loads(fields_json)
+    summary_fields = [field for field in fields if field.get("kind") == "summary"]
+    question_fields = [field for field in fields if field.get("kind") == "question"]
+    return (
+        summary_fields,
+        question_fields,
+        frozenset(field["title"] for field in summary_fields),
+        frozenset(field["title"] for field in question_fields)
+    )
+
 def trigger_selective_extraction(paper_id, selected_fields, selected_models, selected_size):
     """Trigger selective extraction for a specific PDF."""
     try:
@@ -99,12 +401,404 @@ def trigger_selective_extraction(paper_id, selected_fields, selected_models, sel
             "selected_models": selected_models,
             "selected_size": selected_size
         }
-        response = requests.post(f"{API_BASE_URL}/extract/{paper_id}/selective", json=payload)
+        response = get_http().post(f"/extract/{paper_id}/selective", json=payload, timeout=NO_TIMEOUT)
         return response
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {str(e)}")
         return None
 
+def set_session_flag(key, value):
+    """Button callback that stores a flag in session state."""
+    st.session_state[key] = value
+
+def set_delete_confirmation(pid, pending):
+    """Button callback that opens or closes the delete confirmation for a PDF."""
+    confirm_delete = st.session_state.setdefault("confirm_delete", {})
+    if pending:
+        confirm_delete[pid] = True
+    else:
+        confirm_delete.pop(pid, None)
+
+@st.fragment
+def render_pdf_detail(selected_pdf):
+    """Render the details and actions panel; clicks inside it rerun only this fragment."""
+    # Bind the fields used across the panel once
+    pid = selected_pdf.get("id")
+    uri = selected_pdf.get("uri")
+    fname_clean = selected_pdf["_clean"]
+    
+    st.subheader("PDF Details")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**ID:**", pid)
+        st.write("**Filename:**", fname_clean)
+        st.write("**File Size:**", f"{selected_pdf.get('file_size', 0):,} bytes")
+        st.write("**Content Type:**", selected_pdf.get("content_type"))
+        st.write("**Status:**", selected_pdf.get("status"))
+        st.write("**Downloaded:**", "Yes" if selected_pdf.get("is_downloaded") else "No")
+        
+    with col2:
+        st.write("**Converted:**", "✅ Yes" if selected_pdf.get("is_converted") else "❌ No")
+        st.write("**Extracted:**", "✅ Yes" if selected_pdf.get("is_extracted") else "❌ No")
+        st.write("**Processed At:**", selected_pdf.get("processed_at"))
+        
+        # Conversion details
+        if selected_pdf.get("conversion_started_at"):
+            st.write("**Conversion Started:**", selected_pdf.get("conversion_started_at")[:19])
+        if selected_pdf.get("conversion_completed_at"):
+            st.write("**Conversion Completed:**", selected_pdf.get("conversion_completed_at")[:19])
+        if selected_pdf.get("conversion_error"):
+            st.write("**Conversion Error:**", selected_pdf.get("conversion_error"))
+        
+        # Extraction details
+        if selected_pdf.get("extraction_started_at"):
+            st.write("**Extraction Started:**", selected_pdf.get("extraction_started_at")[:19])
+        if selected_pdf.get("extraction_completed_at"):
+            st.write("**Extraction Completed:**", selected_pdf.get("extraction_completed_at")[:19])
+        if selected_pdf.get("extraction_error"):
+            st.write("**Extraction Error:**", selected_pdf.get("extraction_error"))
+            
+        if selected_pdf.get("text_file_path"):
+            st.write("**Text File:**", selected_pdf.get("text_file_path"))
+        if selected_pdf.get("images_folder_path"):
+            st.write("**Images Folder:**", selected_pdf.get("images_folder_path"))
+        if selected_pdf.get("extraction_file_path"):
+            st.write("**Extraction File:**", selected_pdf.get("extraction_file_path"))
+        
+        if selected_pdf.get("error_message"):
+            st.write("**Error:**", selected_pdf.get("error_message"))
+    
+    st.write("**Full URI:**", uri)
+    st.write("**File Path:**", selected_pdf.get("file_path"))
+    
+    # Action buttons section
+    action_buttons_shown = False
+    
+    # Add manual conversion trigger button
+    if (selected_pdf.get("is_downloaded") and 
+        selected_pdf.get("status") == "success" and 
+        not selected_pdf.get("is_converted") and 
+        not selected_pdf.get("conversion_error")):
+        
+        if not action_buttons_shown:
+            st.markdown("---")
+            st.subheader("🔧 Actions")
+            action_buttons_shown = True
+            
+        if st.button("🔄 Trigger Conversion", key=f"convert_{pid}"):
+            # Conversion can take minutes, so don't hold the UI while it runs
+            trigger_conversion(uri)
+            queue_toast("🔄 Conversion queued")
+            clear_pdf_caches()
+            safe_rerun()
+        
+        if uri in st.session_state.get("convert_batch", []):
+            st.caption("📦 In the conversion batch")
+        else:
+            st.button(
+                "➕ Add to Conversion Batch",
+                key=f"stage_{pid}",
+                on_click=stage_conversion,
+                args=(uri,)
+            )
+    
+    # PDFs staged from any row are converted together with one request
+    convert_batch = st.session_state.get("convert_batch", [])
+    if convert_batch:
+        st.info(f"📦 {len(convert_batch)} PDF(s) staged for conversion")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🚀 Convert Selected", key="convert_batch_send"):
+                response = trigger_conversion_batch(convert_batch)
+                if response is not None and response.status_code == 200:
+                    st.session_state.pop("convert_batch", None)
+                    queue_toast(f"🔄 {len(response.json().get('queued', []))} conversion(s) queued")
+                    clear_pdf_caches()
+                    safe_rerun()
+                elif response is not None:
+                    st.error(f"Error: {response.status_code} - {response.text}")
+        with col2:
+            st.button(
+                "✖ Clear Batch",
+                key="convert_batch_clear",
+                on_click=set_session_flag,
+                args=("convert_batch", [])
+            )
+    
+    # Add manual extraction trigger button
+    if (selected_pdf.get("is_converted") and 
+        not selected_pdf.get("is_extracted") and 
+        not selected_pdf.get("extraction_error")):
+        
+        if not action_buttons_shown:
+            st.markdown("---")
+            st.subheader("🔧 Actions")
+            action_buttons_shown = True
+            
+        if st.button("🔍 Trigger Extraction", key=f"extract_{pid}"):
+            trigger_extraction(pid)
+            queue_toast("🔍 Extraction queued")
+            clear_pdf_caches()
+            safe_rerun()
+    
+    # Show extraction results button if available
+    if selected_pdf.get("is_extracted"):
+        if not action_buttons_shown:
+            st.markdown("---")
+            st.subheader("🔧 Actions")
+            action_buttons_shown = True
+            
+        if st.button("📄 View Extraction Results", key=f"view_extract_{pid}"):
+            with st.spinner("Loading extraction results..."):
+                extraction_data = get_extraction_results(pid)
+                if extraction_data:
+                    
+                    st.markdown("---")
+                    st.subheader("📄 Extraction Results")
+                    
+                    # Get extraction data
+                    extract_info = extraction_data.get("extraction_data", {})
+                    summaries = extract_info.get("summaries", [])
+                    questions = extract_info.get("questions", [])
+                    
+                    # Show overview metrics
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("Models Used", len({s.get('model') for s in summaries}))
+                    with col2:
+                        st.metric("Summaries", len(summaries))
+                    with col3:
+                        st.metric("Questions Answered", len(questions))
+                    with col4:
+                        unique_questions = len({q.get('question', '').split('?')[0] + '?' for q in questions})
+                        st.metric("Unique Questions", unique_questions)
+                    
+                    # Show summaries
+                    if summaries:
+                        st.subheader("📝 Summaries by Model")
+                        for summary in summaries:
+                            model_name = summary.get('model', 'Unknown Model')
+                            summary_text = summary.get('summary', 'No summary available')
+                            
+                            with st.expander(f"🤖 {model_name} Summary"):
+                                st.write(summary_text)
+                    
+                    # Show questions and answers
+                    if questions:
+                        st.subheader("❓ Questions & Answers")
+                        
+                        # Get predefined questions from the API
+                        template = get_extraction_template()
+                        if template and template.get("questions"):
+                            predefined_questions = template["questions"]
+                        else:
+                            predefined_questions = []
+                            st.warning("Could not load questions from API")
+                        
+                        # Group answers by question
+                        question_groups = defaultdict(list)
+                        
+                        # The structure is: {"model": "model_name", "question": "answer_text"}
+                        # Since we have model x question combinations, we need to group them properly
+                        
+                        for i, q_item in enumerate(questions):
+                            model = q_item.get('model', 'Unknown Model')
+                            answer = q_item.get('question', 'No answer available')
+                            
+                            # Calculate which question this is based on the pattern:
+                            # Each model answers all questions in sequence
+                            question_index = i % len(predefined_questions)
+                            question_text = predefined_questions[question_index]
+                            
+                            question_groups[question_text].append({
+                                'model': model,
+                                'answer': answer
+                            })
+                        
+                        # Display questions and answers
+                        for question_text, answers in question_groups.items():
+                            with st.expander(f"❓ {question_text}"):
+                                for answer_item in answers:
+                                    model_name = answer_item['model']
+                                    answer_text = answer_item['answer']
+                                    
+                                    st.write(f"**🤖 {model_name}:**")
+                                    st.write(answer_text)
+                                    if len(answers) > 1:  # Only show separator if multiple answers
+                                        st.write("---")
+                        
+                else:
+                    st.error("Failed to load extraction results")
+    
+    # Add delete section with confirmation
+    st.markdown("---")
+    st.subheader("🗑 Danger Zone")
+    
+    # Pending delete confirmations, keyed by PDF id
+    confirm_delete = st.session_state.setdefault("confirm_delete", {})
+    
+    if not confirm_delete.get(pid, False):
+        # Callbacks flip the flag before the fragment reruns, so no explicit rerun is needed
+        st.button(
+            "🗑 Delete PDF",
+            key=f"delete_{pid}",
+            type="secondary",
+            on_click=set_delete_confirmation,
+            args=(pid, True)
+        )
+    else:
+        # Build list of files that will be deleted
+        files_to_delete = []
+        if selected_pdf.get("file_path"):
+            files_to_delete.append("📄 Original PDF file")
+        if selected_pdf.get("text_file_path"):
+            files_to_delete.append("📝 Extracted text file")
+        if selected_pdf.get("images_folder_path"):
+            files_to_delete.append("🖼️ Extracted images folder")
+        
+        file_list = "\n• ".join(files_to_delete) if files_to_delete else "No files to delete"
+        
+        st.warning(f"""⚠️ **Are you sure you want to delete this PDF?**
+
+**Filename:** {fname_clean}
+**File Size:** {selected_pdf.get('file_size', 0):,} bytes
+
+**The following will be permanently deleted:**
+• {file_list}
+• Database record
+
+**This action cannot be undone!**""")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ Yes, Delete", key=f"confirm_yes_{pid}", type="primary"):
+                with st.spinner("Deleting PDF..."):
+                    response = delete_pdf(uri)
+                    if response and response.status_code == 200:
+                        st.success("PDF deleted successfully!")
+                        # Reset session state
+                        confirm_delete.pop(pid, None)
+                        clear_pdf_caches()
+                        safe_rerun()
+                    else:
+                        st.error("Failed to delete PDF")
+                        confirm_delete.pop(pid, None)
+        
+        with col2:
+            st.button(
+                "❌ Cancel",
+                key=f"confirm_no_{pid}",
+                on_click=set_delete_confirmation,
+                args=(pid, False)
+            )
+
+
+@st.fragment
+def render_field_picker(paper_id, fields, selected_model_names, selected_size):
+    """Render the field grid, selection summary and start button; edits rerun only this fragment."""
+    # Separate fields by type, once per template version
+    summary_fields, question_fields, summary_titles, question_titles = partition_fields(
+        json.dumps(fields, sort_keys=True)
+    )
+    
+    # One editable grid instead of a checkbox widget per field
+    field_df = pd.DataFrame([
+        {
+            "title": field.get("title"),
+            "kind": field.get("kind"),
+            "selected": False,
+            "supported": selected_size in field.get("supported_size", []),
+            "supported_sizes": ", ".join(field.get("supported_size", [])),
+            "description": field.get("description", ""),
+        }
+        for field in summary_fields + question_fields
+    ])
+    
+    st.caption(f"Fields not supported for the {selected_size} size are ignored even if selected.")
+    edited_fields = st.data_editor(
+        field_df,
+        column_config={
+            "title": st.column_config.TextColumn("Field", disabled=True),
+            "kind": st.column_config.TextColumn("Kind"),
+            "selected": st.column_config.CheckboxColumn("Selected"),
+            "supported": st.column_config.CheckboxColumn("Supported"),
+            "supported_sizes": st.column_config.TextColumn("Supported Sizes"),
+            "description": st.column_config.TextColumn("Description"),
+        },
+        disabled=["title", "kind", "supported", "supported_sizes", "description"],
+        hide_index=True,
+        use_container_width=True,
+        key="field_grid"
+    )
+    selected_fields = edited_fields.loc[
+        edited_fields["selected"] & edited_fields["supported"], "title"
+    ].tolist()
+    
+    # Show selection summary
+    if selected_fields:
+        st.subheader("📋 Selection Summary")
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Selected Fields", len(selected_fields))
+        with col2:
+            st.metric("Selected Models", len(selected_model_names))
+        with col3:
+            estimated_extractions = len(selected_fields) * len(selected_model_names)
+            st.metric("Total Extractions", estimated_extractions)
+        
+        # Show selected fields
+        st.write("**Selected Fields:**")
+        summary_selected = [f for f in selected_fields if f in summary_titles]
+        question_selected = [f for f in selected_fields if f in question_titles]
+        
+        if summary_selected:
+            st.write(f"📝 Summaries: {', '.join([f.replace('_', ' ').title() for f in summary_selected])}")
+        if question_selected:
+            st.write(f"❓ Questions: {len(question_selected)} questions")
+        
+        st.write(f"🤖 Models: {', '.join(selected_model_names)}")
+        st.write(f"📏 Size: {selected_size.title()}")
+        
+        # Extract button
+        if st.button("🚀 Start Selective Extraction", type="primary"):
+            with st.spinner("Starting selective extraction..."):
+                response = trigger_selective_extraction(
+                    paper_id,
+                    selected_fields,
+                    selected_model_names,
+                    selected_size
+                )
+                
+                if response and response.status_code == 200:
+                    result = response.json()
+                    st.success("Selective extraction started successfully!")
+                    clear_pdf_caches()
+                    
+                    # Show extraction details
+                    st.write("**Extraction Details:**")
+                    st.write(f"- Selected Fields: {len(result.get('selected_fields', []))}")
+                    st.write(f"- Selected Models: {len(result.get('selected_models', []))}")
+                    st.write(f"- Message: {result.get('message')}")
+                    
+                    if result.get("success"):
+                        st.info("Check the PDF List page to view results once extraction completes.")
+                    
+                else:
+                    error_detail = ""
+                    if response:
+                        try:
+                            error_data = response.json()
+                            error_detail = error_data.get("detail", response.text)
+                        except:
+                            error_detail = response.text
+                    st.error(f"Failed to start selective extraction: {error_detail}")
+    
+    else:
+        st.warning("Please select at least one field to extract.")
+
+
 # Sidebar for navigation
 st.sidebar.title("Navigation")
 page = st.sidebar.selectbox("Choose a page", ["📋 PDF List", "➕ Process New PDF", "📊 Statistics", "🔄 Conversion Queue", "🔍 Extraction Queue", "🎯 Selective Extraction"])
@@ -112,52 +806,22 @@ page = st.sidebar.selectbox("Choose a page", ["📋 PDF List", "➕ Process New
 if page == "📋 PDF List":
     st.header("Processed PDFs")
     
-    # Add refresh button
+    # Add refresh button and page selector
     col1, col2 = st.columns([1, 4])
     with col1:
         if st.button("🔄 Refresh"):
-            st.rerun()
+            clear_pdf_caches()
+            safe_rerun()
+    with col2:
+        page_num = st.number_input("Page", min_value=1, value=1, step=1)
     
-    # Fetch all PDFs
-    pdf_data = get_all_pdfs()
+    # Fetch one page of PDFs; reruns within the page reuse the stored list and table
+    pdf_data, df = load_pdf_list(page_num)
     
     if pdf_data and pdf_data.get("pdfs"):
         pdfs = pdf_data["pdfs"]
-        st.success(f"Found {pdf_data['count']} processed PDFs")
-        
-        # Convert to DataFrame for better display
-        df_data = []
-        for pdf in pdfs:
-            # Determine conversion status
-            is_converted = pdf.get("is_converted", False)
-            conversion_status = "✅ Converted" if is_converted else "⏳ Pending"
-            if pdf.get("conversion_error"):
-                conversion_status = "❌ Failed"
-            elif pdf.get("conversion_started_at") and not is_converted:
-                conversion_status = "🔄 Converting"
-            
-            # Determine extraction status
-            is_extracted = pdf.get("is_extracted", False)
-            extraction_status = "✅ Extracted" if is_extracted else "⏳ Pending"
-            if pdf.get("extraction_error"):
-                extraction_status = "❌ Failed"
-            elif pdf.get("extraction_started_at") and not is_extracted:
-                extraction_status = "🔄 Extracting"
-            elif not is_converted:
-                extraction_status = "⏸ Waiting for conversion"
-            
-            df_data.append({
-                "ID": pdf.get("id", ""),
-                "URI": pdf.get("uri", "")[:50] + "..." if len(pdf.get("uri", "")) > 50 else pdf.get("uri", ""),
-                "Filename": clean_filename(pdf.get("filename", "")),
-                "File Size (KB)": round(pdf.get("file_size", 0) / 1024, 2) if pdf.get("file_size") else 0,
-                "Status": "✅ Success" if pdf.get("status") == "success" else "❌ Error",
-                "Downloaded": "✅ Yes" if pdf.get("is_downloaded") else "❌ No",
-                "Converted": conversion_status,
-                "Processed At": pdf.get("processed_at", "")[:19] if pdf.get("processed_at") else ""
-            })
-        
-        df = pd.DataFrame(df_data)
+        first = (page_num - 1) * PDF_PAGE_SIZE + 1
+        st.success(f"Found {pdf_data.get('total', pdf_data['count'])} processed PDFs (showing {first}-{first + len(pdfs) - 1})")
 
         df_state = st.dataframe(
             df,
@@ -176,257 +840,21 @@ if page == "📋 PDF List":
         
         # Show detailed view for selected PDF
         st.subheader("PDF Details")
+        pdf_labels = [f"{pdf['_clean']} - {pdf.get('uri', '')[:30]}..." for pdf in pdfs]
         selected_indices = st.selectbox(
             "Select a PDF to view details:",
             options=range(len(pdfs)),
-            format_func=lambda i: f"{clean_filename(pdfs[i].get('filename', 'Unknown'))} - {pdfs[i].get('uri', '')[:30]}..."
+            format_func=pdf_labels.__getitem__
         )
 
         selected_rows = df_state.get("selection", {}).get("rows", []) if isinstance(df_state, dict) else []
         selected_idx = selected_rows[0] if selected_rows else None
 
         if selected_idx is not None:
-            st.subheader("PDF Details")
-            selected_pdf = pdfs[selected_idx]
-
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write("**ID:**", selected_pdf.get("id"))
-                st.write("**Filename:**", clean_filename(selected_pdf.get("filename")))
-                st.write("**File Size:**", f"{selected_pdf.get('file_size', 0):,} bytes")
-                st.write("**Content Type:**", selected_pdf.get("content_type"))
-                st.write("**Status:**", selected_pdf.get("status"))
-                st.write("**Downloaded:**", "Yes" if selected_pdf.get("is_downloaded") else "No")
-                
-            with col2:
-                st.write("**Converted:**", "✅ Yes" if selected_pdf.get("is_converted") else "❌ No")
-                st.write("**Extracted:**", "✅ Yes" if selected_pdf.get("is_extracted") else "❌ No")
-                st.write("**Processed At:**", selected_pdf.get("processed_at"))
-                
-                # Conversion details
-                if selected_pdf.get("conversion_started_at"):
-                    st.write("**Conversion Started:**", selected_pdf.get("conversion_started_at")[:19])
-                if selected_pdf.get("conversion_completed_at"):
-                    st.write("**Conversion Completed:**", selected_pdf.get("conversion_completed_at")[:19])
-                if selected_pdf.get("conversion_error"):
-                    st.write("**Conversion Error:**", selected_pdf.get("conversion_error"))
-                
-                # Extraction details
-                if selected_pdf.get("extraction_started_at"):
-                    st.write("**Extraction Started:**", selected_pdf.get("extraction_started_at")[:19])
-                if selected_pdf.get("extraction_completed_at"):
-                    st.write("**Extraction Completed:**", selected_pdf.get("extraction_completed_at")[:19])
-                if selected_pdf.get("extraction_error"):
-                    st.write("**Extraction Error:**", selected_pdf.get("extraction_error"))
-                    
-                if selected_pdf.get("text_file_path"):
-                    st.write("**Text File:**", selected_pdf.get("text_file_path"))
-                if selected_pdf.get("images_folder_path"):
-                    st.write("**Images Folder:**", selected_pdf.get("images_folder_path"))
-                if selected_pdf.get("extraction_file_path"):
-                    st.write("**Extraction File:**", selected_pdf.get("extraction_file_path"))
-                
-                if selected_pdf.get("error_message"):
-                    st.write("**Error:**", selected_pdf.get("error_message"))
-            
-            st.write("**Full URI:**", selected_pdf.get("uri"))
-            st.write("**File Path:**", selected_pdf.get("file_path"))
-            
-            # Action buttons section
-            action_buttons_shown = False
-            
-            # Add manual conversion trigger button
-            if (selected_pdf.get("is_downloaded") and 
-                selected_pdf.get("status") == "success" and 
-                not selected_pdf.get("is_converted") and 
-                not selected_pdf.get("conversion_error")):
-                
-                if not action_buttons_shown:
-                    st.markdown("---")
-                    st.subheader("🔧 Actions")
-                    action_buttons_shown = True
-                    
-                if st.button("🔄 Trigger Conversion", key=f"convert_{selected_pdf.get('id')}"):
-                    with st.spinner("Triggering conversion..."):
-                        response = trigger_conversion(selected_pdf.get("uri"))
-                        if response and response.status_code == 200:
-                            st.success("Conversion triggered successfully!")
-                            st.rerun()
-                        else:
-                            st.error("Failed to trigger conversion")
-            
-            # Add manual extraction trigger button
-            if (selected_pdf.get("is_converted") and 
-                not selected_pdf.get("is_extracted") and 
-                not selected_pdf.get("extraction_error")):
-                
-                if not action_buttons_shown:
-                    st.markdown("---")
-                    st.subheader("🔧 Actions")
-                    action_buttons_shown = True
-                    
-                if st.button("🔍 Trigger Extraction", key=f"extract_{selected_pdf.get('id')}"):
-                    with st.spinner("Triggering extraction..."):
-                        response = trigger_extraction(selected_pdf.get("id"))
-                        if response and response.status_code == 200:
-                            st.success("Extraction triggered successfully!")
-                            st.rerun()
-                        else:
-                            st.error("Failed to trigger extraction")
-            
-            # Show extraction results button if available
-            if selected_pdf.get("is_extracted"):
-                if not action_buttons_shown:
-                    st.markdown("---")
-                    st.subheader("🔧 Actions")
-                    action_buttons_shown = True
-                    
-                if st.button("📄 View Extraction Results", key=f"view_extract_{selected_pdf.get('id')}"):
-                    with st.spinner("Loading extraction results..."):
-                        response = get_extraction_results(selected_pdf.get("id"))
-                        if response and response.status_code == 200:
-                            extraction_data = response.json()
-                            
-                            st.markdown("---")
-                            st.subheader("📄 Extraction Results")
-                            
-                            # Get extraction data
-                            extract_info = extraction_data.get("extraction_data", {})
-                            summaries = extract_info.get("summaries", [])
-                            questions = extract_info.get("questions", [])
-                            
-                            # Show overview metrics
-                            col1, col2, col3, col4 = st.columns(4)
-                            with col1:
-                                st.metric("Models Used", len(set([s.get('model') for s in summaries])))
-                            with col2:
-                                st.metric("Summaries", len(summaries))
-                            with col3:
-                                st.metric("Questions Answered", len(questions))
-                            with col4:
-                                unique_questions = len(set([q.get('question', '').split('?')[0] + '?' for q in questions]))
-                                st.metric("Unique Questions", unique_questions)
-                            
-                            # Show summaries
-                            if summaries:
-                                st.subheader("📝 Summaries by Model")
-                                for summary in summaries:
-                                    model_name = summary.get('model', 'Unknown Model')
-                                    summary_text = summary.get('summary', 'No summary available')
-                                    
-                                    with st.expander(f"🤖 {model_name} Summary"):
-                                        st.write(summary_text)
-                            
-                            # Show questions and answers
-                            if questions:
-                                st.subheader("❓ Questions & Answers")
-                                
-                                # Get predefined questions from the API
-                                template = get_extraction_template()
-                                if template and template.get("questions"):
-                                    predefined_questions = template["questions"]
-                                else:
-                                    predefined_questions = []
-                                    st.warning("Could not load questions from API")
-                                
-                                # Group answers by question
-                                question_groups = {}
-                                
-                                # The structure is: {"model": "model_name", "question": "answer_text"}
-                                # Since we have model x question combinations, we need to group them properly
-                                
-                                # First, let's understand how many questions per model we have
-                                models_used = list(set([q.get('model') for q in questions]))
-                                questions_per_model = len(questions) // len(models_used) if models_used else 0
-                                
-                                for i, q_item in enumerate(questions):
-                                    model = q_item.get('model', 'Unknown Model')
-                                    answer = q_item.get('question', 'No answer available')
-                                    
-                                    # Calculate which question this is based on the pattern:
-                                    # Each model answers all questions in sequence
-                                    question_index = i % len(predefined_questions)
-                                    question_text = predefined_questions[question_index]
-                                    
-                                    if question_text not in question_groups:
-                                        question_groups[question_text] = []
-                                    
-                                    question_groups[question_text].append({
-                                        'model': model,
-                                        'answer': answer
-                                    })
-                                
-                                # Display questions and answers
-                                for question_text, answers in question_groups.items():
-                                    with st.expander(f"❓ {question_text}"):
-                                        for answer_item in answers:
-                                            model_name = answer_item['model']
-                                            answer_text = answer_item['answer']
-                                            
-                                            st.write(f"**🤖 {model_name}:**")
-                                            st.write(answer_text)
-                                            if len(answers) > 1:  # Only show separator if multiple answers
-                                                st.write("---")
-                                
-                        else:
-                            st.error("Failed to load extraction results")
-            
-            # Add delete section with confirmation
-            st.markdown("---")
-            st.subheader("🗑 Danger Zone")
-            
-            # Initialize session state for delete confirmation
-            delete_key = f"confirm_delete_{selected_pdf.get('id')}"
-            if delete_key not in st.session_state:
-                st.session_state[delete_key] = False
-            
-            if not st.session_state[delete_key]:
-                if st.button("🗑 Delete PDF", key=f"delete_{selected_pdf.get('id')}", type="secondary"):
-                    st.session_state[delete_key] = True
-                    st.rerun()
-            else:
-                # Build list of files that will be deleted
-                files_to_delete = []
-                if selected_pdf.get("file_path"):
-                    files_to_delete.append("📄 Original PDF file")
-                if selected_pdf.get("text_file_path"):
-                    files_to_delete.append("📝 Extracted text file")
-                if selected_pdf.get("images_folder_path"):
-                    files_to_delete.append("🖼️ Extracted images folder")
-                
-                file_list = "\n• ".join(files_to_delete) if files_to_delete else "No files to delete"
-                
-                st.warning(f"""⚠️ **Are you sure you want to delete this PDF?**
-
-**Filename:** {clean_filename(selected_pdf.get('filename'))}
-**File Size:** {selected_pdf.get('file_size', 0):,} bytes
-
-**The following will be permanently deleted:**
-• {file_list}
-• Database record
-
-**This action cannot be undone!**""")
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("✅ Yes, Delete", key=f"confirm_yes_{selected_pdf.get('id')}", type="primary"):
-                        with st.spinner("Deleting PDF..."):
-                            response = delete_pdf(selected_pdf.get("uri"))
-                            if response and response.status_code == 200:
-                                st.success("PDF deleted successfully!")
-                                # Reset session state
-                                st.session_state[delete_key] = False
-                                st.rerun()
-                            else:
-                                st.error("Failed to delete PDF")
-                                st.session_state[delete_key] = False
-                
-                with col2:
-                    if st.button("❌ Cancel", key=f"confirm_no_{selected_pdf.get('id')}"):
-                        st.session_state[delete_key] = False
-                        st.rerun()
+            render_pdf_detail(pdfs[selected_idx])
             
+    elif pdf_data and pdf_data.get("total"):
+        st.info(f"No PDFs on page {page_num}; there are {pdf_data['total']} in total.")
     else:
         st.info("No PDFs have been processed yet. Use the 'Process New PDF' page to add some!")
 
@@ -439,12 +867,19 @@ elif page == "➕ Process New PDF":
         if user_input:
             with st.spinner("Processing PDF..."):
                 try:
-                    response = requests.post(f"{API_BASE_URL}/pdfs", json={"uri": user_input})
+                    response = get_http().post("/pdfs", json={"uri": user_input}, timeout=NO_TIMEOUT)
                     
                     if response.status_code == 200:
                         result = response.json()
                         st.success("PDF processed successfully!")
                         
+                        # New downloads are added to the stored list directly;
+                        # anything else (skips, errors) triggers a refetch
+                        if result.get("database_id"):
+                            add_processed_pdf(result)
+                        else:
+                            clear_pdf_caches()
+                        
                         # Show processing results
                         col1, col2 = st.columns(2)
                         with col1:
@@ -469,7 +904,7 @@ elif page == "➕ Process New PDF":
                     else:
                         st.error(f"Error: {response.status_code} - {response.text}")
                         
-                except requests.exceptions.RequestException as e:
+                except httpx.HTTPError as e:
                     st.error(f"Connection error: {str(e)}")
         else:
             st.warning("Please enter a PDF URL")
@@ -548,25 +983,39 @@ elif page == "🔄 Conversion Queue":
     
     # Process conversion queue button
     if st.button("🚀 Process All Pending Conversions"):
-        with st.spinner("Processing conversion queue..."):
-            try:
-                response = requests.post(f"{API_BASE_URL}/convert/process-queue")
-                if response.status_code == 200:
+        with st.spinner("Queueing pending conversions..."):
+            # Downloaded, not converted, and not already converting (a failed
+            # conversion keeps its start time, so it can be retried)
+            clear_pdf_caches()
+            pdf_data = get_all_pdfs() or {}
+            pending = [
+                pdf["uri"]
+                for pdf in pdf_data.get("pdfs", [])
+                if pdf.get("is_downloaded") and pdf.get("status") == "success" and not pdf.get("is_converted")
+                and (not pdf.get("conversion_started_at") or pdf.get("conversion_error"))
+            ]
+            
+            if not pending:
+                st.info("No PDFs are pending conversion.")
+            else:
+                # One request; the backend's bounded worker pool does the converting
+                response = trigger_conversion_batch(pending)
+                if response is not None and response.status_code == 200:
                     result = response.json()
-                    st.success(result.get("message", "Queue processed successfully!"))
-                    
-                    # Show results if available
-                    if result.get("results"):
-                        st.subheader("Conversion Results")
-                        for res in result["results"]:
-                            if res.get("success"):
-                                st.success(f"✅ {res.get('uri')}: {res.get('message')}")
-                            else:
-                                st.error(f"❌ {res.get('uri')}: {res.get('error')}")
-                else:
+                    st.success(f"🔄 Queued {len(result.get('queued', []))} PDFs for conversion")
+                    st.subheader("Conversion Results")
+                    for uri in result.get("queued", []):
+                        st.write(f"⏳ {uri}: queued")
+                    for uri in result.get("in_progress", []):
+                        st.write(f"🔄 {uri}: already queued or converting")
+                    for uri in result.get("already_converted", []):
+                        st.write(f"✅ {uri}: already converted")
+                    for item in result.get("rejected", []):
+                        st.error(f"❌ {item.get('uri')}: {item.get('detail')}")
+                    st.info("Conversions run in the background; refresh the PDF List page to follow their progress.")
+                elif response is not None:
                     st.error(f"Error: {response.status_code} - {response.text}")
-            except requests.exceptions.RequestException as e:
-                st.error(f"Connection error: {str(e)}")
+                clear_pdf_caches()
     
     st.markdown("---")
     st.info("Use this page to manually trigger conversion of all pending PDFs. The system automatically converts PDFs when they are first added, but you can use this if any conversions failed or were missed.")
@@ -576,27 +1025,35 @@ elif page == "🔍 Extraction Queue":
     
     # Process extraction queue button
     if st.button("🚀 Process All Pending Extractions"):
-        with st.spinner("Processing extraction queue..."):
-            try:
-                response = requests.post(f"{API_BASE_URL}/extract/process-queue")
+        try:
+            # Ask for NDJSON so each result can be shown as soon as it is ready
+            with get_http().stream(
+                "POST",
+                "/extract/process-queue",
+                headers={"Accept": "application/x-ndjson"},
+                timeout=NO_TIMEOUT
+            ) as response:
                 if response.status_code == 200:
-                    result = response.json()
-                    st.success(result.get("message", "Queue processed successfully!"))
-                    
-                    # Show results if available
-                    if result.get("results"):
-                        st.subheader("Extraction Results")
-                        for res in result["results"]:
+                    processed = 0
+                    with st.status("Processing extraction queue...", expanded=True) as status:
+                        for line in response.iter_lines():
+                            if not line:
+                                continue
+                            res = json.loads(line)
+                            processed += 1
                             if res.get("success"):
                                 st.success(f"✅ {res.get('uri')}: {res.get('message')}")
                                 if res.get("extracted_sections"):
                                     st.info(f"   📄 Extracted {res.get('extracted_sections')} sections and {res.get('extracted_entities', 0)} entities")
                             else:
                                 st.error(f"❌ {res.get('uri')}: {res.get('error')}")
+                        status.update(label=f"Processed {processed} PDFs", state="complete")
+                    clear_pdf_caches()
                 else:
+                    response.read()
                     st.error(f"Error: {response.status_code} - {response.text}")
-            except requests.exceptions.RequestException as e:
-                st.error(f"Connection error: {str(e)}")
+        except httpx.HTTPError as e:
+            st.error(f"Connection error: {str(e)}")
     
     st.markdown("---")
     st.info("Use this page to manually trigger extraction of all converted PDFs. The system automatically extracts PDFs after they are converted, but you can use this if any extractions failed or were missed.")
@@ -604,36 +1061,50 @@ elif page == "🔍 Extraction Queue":
 elif page == "🎯 Selective Extraction":
     st.header("Selective Field Extraction")
     
+    if st.button("🔄 Reload template"):
+        extraction_template.clear()
+        safe_rerun()
+    
+    # Fetch the template and the converted PDF summaries in parallel
+    template_future, pdfs_future = fetch_concurrently(extraction_template, fetch_converted_pdf_summaries)
+    
     # Get extraction template
-    template = get_extraction_template()
+    template = get_extraction_template(template_future.result)
     if not template:
         st.error("Could not load extraction template from API")
         st.stop()
     
-    # Get list of converted PDFs for selection
-    pdf_data = get_all_pdfs()
-    if not pdf_data or not pdf_data.get("pdfs"):
-        st.warning("No PDFs available. Please process some PDFs first.")
+    # Get list of converted PDFs for selection; only id, URI and filename are sent
+    pdf_data = get_all_pdfs(pdfs_future.result)
+    if pdf_data is None:
         st.stop()
     
-    # Filter for converted PDFs
-    converted_pdfs = [pdf for pdf in pdf_data["pdfs"] if pdf.get("is_converted")]
+    converted_pdfs = pdf_data.get("pdfs", [])
     if not converted_pdfs:
         st.warning("No converted PDFs available. Please convert some PDFs first.")
         st.stop()
     
+    pdf_labels = []
+    for pdf in converted_pdfs:
+        pdf["_clean"] = clean_filename(pdf.get("filename", "Unknown"))
+        pdf_labels.append(f"{pdf['_clean']} (ID: {pdf.get('id')})")
+    
     # PDF Selection
     st.subheader("📄 Select PDF")
     selected_pdf_idx = st.selectbox(
         "Choose a PDF for selective extraction:",
         options=range(len(converted_pdfs)),
-        format_func=lambda i: f"{clean_filename(converted_pdfs[i].get('filename', 'Unknown'))} (ID: {converted_pdfs[i].get('id')})"
+        format_func=pdf_labels.__getitem__
     )
     
     if selected_pdf_idx is not None:
-        selected_pdf = converted_pdfs[selected_pdf_idx]
+        # Fetch the full record only for the PDF that was picked
+        selected_pdf = get_pdf(converted_pdfs[selected_pdf_idx]["id"])
+        if not selected_pdf:
+            st.stop()
+        selected_pdf["_clean"] = converted_pdfs[selected_pdf_idx]["_clean"]
         
-        st.info(f"**Selected PDF:** {clean_filename(selected_pdf.get('filename'))}")
+        st.info(f"**Selected PDF:** {selected_pdf['_clean']}")
         st.write(f"**URI:** {selected_pdf.get('uri')}")
         
         # Model Selection
@@ -658,11 +1129,12 @@ elif page == "🎯 Selective Extraction":
             })
         
         # Multi-select for models
+        display_by_name = {model["name"]: model["display"] for model in model_options}
         selected_model_names = st.multiselect(
             "Select models to use for extraction:",
-            options=[model["name"] for model in model_options],
+            options=list(display_by_name),
             default=[model_options[0]["name"]] if model_options else [],
-            format_func=lambda name: next(model["display"] for model in model_options if model["name"] == name)
+            format_func=display_by_name.get
         )
         
         if not selected_model_names:
@@ -689,118 +1161,7 @@ elif page == "🎯 Selective Extraction":
             st.error("No fields available in template")
             st.stop()
         
-        # Separate fields by type
-        summary_fields = [field for field in fields if field.get("kind") == "summary"]
-        question_fields = [field for field in fields if field.get("kind") == "question"]
-        
-        selected_fields = []
-        
-        # Summary fields section
-        if summary_fields:
-            st.write("**📝 Summary Fields:**")
-            for field in summary_fields:
-                field_title = field.get("title")
-                field_description = field.get("description", "")
-                supported_sizes = field.get("supported_size", [])
-                
-                # Check if current size is supported
-                size_supported = selected_size in supported_sizes
-                help_text = f"{field_description}"
-                if not size_supported:
-                    help_text += f" (⚠️ {selected_size} size not supported - supported: {', '.join(supported_sizes)})"
-                
-                if st.checkbox(
-                    field_title.replace("_", " ").title(),
-                    key=f"summary_{field_title}",
-                    help=help_text,
-                    disabled=not size_supported
-                ):
-                    if size_supported:
-                        selected_fields.append(field_title)
-        
-        # Question fields section
-        if question_fields:
-            st.write("**❓ Question Fields:**")
-            for field in question_fields:
-                field_title = field.get("title")
-                supported_sizes = field.get("supported_size", [])
-                
-                # Check if current size is supported
-                size_supported = selected_size in supported_sizes
-                help_text = f"Answer to: {field_title}"
-                if not size_supported:
-                    help_text += f" (⚠️ {selected_size} size not supported - supported: {', '.join(supported_sizes)})"
-                
-                if st.checkbox(
-                    field_title,
-                    key=f"question_{field_title}",
-                    help=help_text,
-                    disabled=not size_supported
-                ):
-                    if size_supported:
-                        selected_fields.append(field_title)
-        
-        # Show selection summary
-        if selected_fields:
-            st.subheader("📋 Selection Summary")
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("Selected Fields", len(selected_fields))
-            with col2:
-                st.metric("Selected Models", len(selected_model_names))
-            with col3:
-                estimated_extractions = len(selected_fields) * len(selected_model_names)
-                st.metric("Total Extractions", estimated_extractions)
-            
-            # Show selected fields
-            st.write("**Selected Fields:**")
-            summary_selected = [f for f in selected_fields if f in [field["title"] for field in summary_fields]]
-            question_selected = [f for f in selected_fields if f in [field["title"] for field in question_fields]]
-            
-            if summary_selected:
-                st.write(f"📝 Summaries: {', '.join([f.replace('_', ' ').title() for f in summary_selected])}")
-            if question_selected:
-                st.write(f"❓ Questions: {len(question_selected)} questions")
-            
-            st.write(f"🤖 Models: {', '.join(selected_model_names)}")
-            st.write(f"📏 Size: {selected_size.title()}")
-            
-            # Extract button
-            if st.button("🚀 Start Selective Extraction", type="primary"):
-                with st.spinner("Starting selective extraction..."):
-                    response = trigger_selective_extraction(
-                        selected_pdf.get("id"),
-                        selected_fields,
-                        selected_model_names,
-                        selected_size
-                    )
-                    
-                    if response and response.status_code == 200:
-                        result = response.json()
-                        st.success("Selective extraction started successfully!")
-                        
-                        # Show extraction details
-                        st.write("**Extraction Details:**")
-                        st.write(f"- Selected Fields: {len(result.get('selected_fields', []))}")
-                        st.write(f"- Selected Models: {len(result.get('selected_models', []))}")
-                        st.write(f"- Message: {result.get('message')}")
-                        
-                        if result.get("success"):
-                            st.info("Check the PDF List page to view results once extraction completes.")
-                        
-                    else:
-                        error_detail = ""
-                        if response:
-                            try:
-                                error_data = response.json()
-                                error_detail = error_data.get("detail", response.text)
-                            except:
-                                error_detail = response.text
-                        st.error(f"Failed to start selective extraction: {error_detail}")
-        
-        else:
-            st.warning("Please select at least one field to extract.")
+        render_field_picker(selected_pdf.get("id"), fields, selected_model_names, selected_size)
     
     st.markdown("---")
     st.info("💡 Use this page to extract only specific fields you need, saving time and resources. You can select different combinations of summary types, questions, models, and sizes based on your requirements.")
@@ -0,0 +1,147 @@
+import contextlib
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+# Stub out the backend's heavy modules once, when pytest loads this file,
+# so importing fastapi_app/main.py needs no database, models or downloads
+
+processor = types.ModuleType("processor")
+class ProcessInputData(BaseModel):
+    uri: str
+async def process_pdf(data: ProcessInputData):
+    return {"uri": data.uri, "downloaded": True, "is_pdf": True, "file_path": "file.pdf"}
+async def close_http_client():
+    pass
+processor.ProcessInputData = ProcessInputData
+processor.process_pdf = process_pdf
+processor.close_http_client = close_http_client
+sys.modules["processor"] = processor
+
+database = types.ModuleType("database")
+def init_database():
+    pass
+def get_all_processed_pdfs(limit=None, offset=0):
+    pdfs = [{"id": i, "uri": f"uri{i}"} for i in range(5)]
+    return pdfs[offset:] if limit is None else pdfs[offset:offset + limit]
+def count_processed_pdfs():
+    return 5
+def get_pdf_summaries(converted_only=False):
+    return [{"id": i, "uri": f"uri{i}", "filename": f"paper{i}.pdf", "is_converted": i % 2 == 0} for i in range(5)
+            if not converted_only or i % 2 == 0]
+def get_processed_pdf(uri: str):
+    return {"uri": uri, "file_path": "file.pdf", "is_downloaded": True, "status": "success", "is_converted": True, "is_extracted": True, "extraction_file_path": "res.json"}
+def get_processed_pdf_by_id(pid: int):
+    return {"id": pid, "uri": f"uri{pid}", "is_converted": True, "is_extracted": True, "extraction_file_path": "res.json"}
+def delete_processed_pdf(uri: str):
+    return True
+def get_processing_stats():
+    return {"total": 0}
+def check_uri_exists(uri: str):
+    return None
+def check_content_exists(h: str):
+    return None
+def hash_file_content(p: str):
+    return "hash"
+def reset_all_interrupted():
+    return (0, 0)
+def get_pdfs_etag():
+    return '"etag"'
+def get_pdfs_for_conversion():
+    return [{"uri": "a"}, {"uri": "b"}]
+@contextlib.contextmanager
+def get_db_connection():
+    class DummyCursor:
+        def execute(self, *args, **kwargs):
+            pass
+        def fetchall(self):
+            return []
+        def fetchone(self):
+            return (0, 0, 0)
+    class DummyConn:
+        def cursor(self):
+            return DummyCursor()
+        def commit(self):
+            pass
+        def close(self):
+            pass
+    yield DummyConn()
+database.init_database = init_database
+database.get_all_processed_pdfs = get_all_processed_pdfs
+database.count_processed_pdfs = count_processed_pdfs
+database.get_pdf_summaries = get_pdf_summaries
+database.get_processed_pdf = get_processed_pdf
+database.get_processed_pdf_by_id = get_processed_pdf_by_id
+database.delete_processed_pdf = delete_processed_pdf
+database.get_processing_stats = get_processing_stats
+database.check_uri_exists = check_uri_exists
+database.check_content_exists = check_content_exists
+database.hash_file_content = hash_file_content
+database.reset_all_interrupted = reset_all_interrupted
+database.get_pdfs_etag = get_pdfs_etag
+database.get_pdfs_for_conversion = get_pdfs_for_conversion
+database.get_db_connection = get_db_connection
+sys.modules["database"] = database
+
+conv = types.ModuleType("conversion_service")
+async def convert_pdf_async(uri: str):
+    return {"success": True, "uri": uri, "message": "converted"}
+conv.convert_pdf_async = convert_pdf_async
+sys.modules["conversion_service"] = conv
+
+ext = types.ModuleType("extraction_service")
+async def extract_pdf_async(uri: str):
+    return {"extracted": uri}
+async def iter_extraction_queue():
+    yield {"success": True, "uri": "a", "message": "extracted"}
+async def process_extraction_queue():
+    return [result async for result in iter_extraction_queue()]
+async def extract_pdf_selective_async(uri, fields, models, size):
+    return {"extracted": uri, "fields": fields}
+def get_extraction_template():
+    return {
+        "fields": [{"title": "title"}, {"title": "abstract"}],
+        "models": [{"name": "model1"}],
+    }
+ext.extract_pdf_async = extract_pdf_async
+ext.iter_extraction_queue = iter_extraction_queue
+ext.process_extraction_queue = process_extraction_queue
+ext.extract_pdf_selective_async = extract_pdf_selective_async
+ext.get_extraction_template = get_extraction_template
+sys.modules["extraction_service"] = ext
+
+config = types.ModuleType("config")
+def resolve_file_path(p: str):
+    return Path(p)
+def get_pdf_conversion_folder(filename: str):
+    return Path(filename).parent
+config.resolve_file_path = resolve_file_path
+config.get_pdf_conversion_folder = get_pdf_conversion_folder
+sys.modules["config"] = config
+
+llm_pkg = types.ModuleType("llm")
+questions_mod = types.ModuleType("llm.questions")
+questions_mod.question_list = []
+llm_mod = types.ModuleType("llm.llm")
+llm_mod.model_list = []
+sys.modules["llm"] = llm_pkg
+sys.modules["llm.questions"] = questions_mod
+sys.modules["llm.llm"] = llm_mod
+
+
+@pytest.fixture(scope="session")
+def app():
+    sys.path.insert(0, "fastapi_app")
+    return importlib.import_module("main").app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    # Run the lifespan once so the conversion queue used by POST /pdfs exists
+    with TestClient(app) as c:
+        yield c
@@ -1,165 +1,71 @@
-import importlib
+import asyncio
+import functools
+import json
+import re
 import sys
-import types
 from pathlib import Path
 import yaml
 import pytest
-from fastapi.testclient import TestClient
+
+@functools.lru_cache(maxsize=None)
+def load_spec():
+    # The C loader parses the spec much faster when libyaml is available
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(Path("docs/openapi.yaml"), "rb") as f:
+        return yaml.load(f, Loader=loader)
+
 
 @pytest.fixture(scope="session")
-def app():
-    # Create stub modules required by main
-    processor = types.ModuleType("processor")
-    from pydantic import BaseModel
-    class ProcessInputData(BaseModel):
-        uri: str
-    def process_pdf(data: ProcessInputData):
-        return {"uri": data.uri, "downloaded": True, "is_pdf": True, "file_path": "file.pdf"}
-    processor.ProcessInputData = ProcessInputData
-    processor.process_pdf = process_pdf
-    sys.modules["processor"] = processor
-
-    database = types.ModuleType("database")
-    def init_database():
-        pass
-    def get_all_processed_pdfs():
-        return []
-    def get_processed_pdf(uri: str):
-        return {"uri": uri, "file_path": "file.pdf", "is_downloaded": True, "status": "success", "is_converted": True, "is_extracted": True, "extraction_file_path": "res.json"}
-    def get_processed_pdf_by_id(pid: int):
-        return {"id": pid, "uri": f"uri{pid}", "is_converted": True, "is_extracted": True, "extraction_file_path": "res.json"}
-    def delete_processed_pdf(uri: str):
-        return True
-    def get_processing_stats():
-        return {"total": 0}
-    def check_uri_exists(uri: str):
-        return None
-    def check_content_exists(h: str):
-        return None
-    def hash_file_content(p: str):
-        return "hash"
-    def reset_interrupted_conversions():
-        return 0
-    def reset_interrupted_extractions():
-        return 0
-    import contextlib
-    @contextlib.contextmanager
-    def get_db_connection():
-        class DummyCursor:
-            def execute(self, *args, **kwargs):
-                pass
-            def fetchall(self):
-                return []
-            def fetchone(self):
-                return (0, 0, 0)
-        class DummyConn:
-            def cursor(self):
-                return DummyCursor()
-            def commit(self):
-                pass
-            def close(self):
-                pass
-        yield DummyConn()
-    database.init_database = init_database
-    database.get_all_processed_pdfs = get_all_processed_pdfs
-    database.get_processed_pdf = get_processed_pdf
-    database.get_processed_pdf_by_id = get_processed_pdf_by_id
-    database.delete_processed_pdf = delete_processed_pdf
-    database.get_processing_stats = get_processing_stats
-    database.check_uri_exists = check_uri_exists
-    database.check_content_exists = check_content_exists
-    database.hash_file_content = hash_file_content
-    database.reset_interrupted_conversions = reset_interrupted_conversions
-    database.reset_interrupted_extractions = reset_interrupted_extractions
-    database.get_db_connection = get_db_connection
-    sys.modules["database"] = database
-
-    conv = types.ModuleType("conversion_service")
-    async def convert_pdf_async(uri: str):
-        return {"converted": uri}
-    async def process_conversion_queue():
-        return []
-    conv.convert_pdf_async = convert_pdf_async
-    conv.process_conversion_queue = process_conversion_queue
-    sys.modules["conversion_service"] = conv
-
-    ext = types.ModuleType("extraction_service")
-    async def extract_pdf_async(uri: str):
-        return {"extracted": uri}
-    async def process_extraction_queue():
-        return []
-    async def extract_pdf_selective_async(uri, fields, models, size):
-        return {"extracted": uri, "fields": fields}
-    def get_extraction_template():
-        return {
-            "fields": [{"title": "title"}, {"title": "abstract"}],
-            "models": [{"name": "model1"}],
-        }
-    ext.extract_pdf_async = extract_pdf_async
-    ext.process_extraction_queue = process_extraction_queue
-    ext.extract_pdf_selective_async = extract_pdf_selective_async
-    ext.get_extraction_template = get_extraction_template
-    sys.modules["extraction_service"] = ext
-
-    config = types.ModuleType("config")
-    def resolve_file_path(p: str):
-        return Path(p)
-    def get_pdf_conversion_folder(filename: str):
-        return Path(filename).parent
-    config.resolve_file_path = resolve_file_path
-    config.get_pdf_conversion_folder = get_pdf_conversion_folder
-    sys.modules["config"] = config
-
-    llm_pkg = types.ModuleType("llm")
-    questions_mod = types.ModuleType("llm.questions")
-    questions_mod.question_list = []
-    llm_mod = types.ModuleType("llm.llm")
-    llm_mod.model_list = []
-    sys.modules["llm"] = llm_pkg
-    sys.modules["llm.questions"] = questions_mod
-    sys.modules["llm.llm"] = llm_mod
-
-    sys.path.insert(0, "fastapi_app")
-    main = importlib.import_module("main")
-    return main.app
+def spec():
+    return load_spec()
 
 
-def load_spec():
-    with open(Path("docs/openapi.yaml"), "r") as f:
-        return yaml.safe_load(f)
+# How each HTTP method in the spec is exercised
+METHOD_CALLS = {
+    "get": lambda client, url, body: client.get(url),
+    "post": lambda client, url, body: client.post(url, json=body),
+    "delete": lambda client, url, body: client.delete(url),
+}
+
+# Example request bodies, by the first matching path rule
+REQUEST_BODIES = (
+    (lambda path: path.startswith("/pdfs"), {"uri": "http://example.com/sample.pdf"}),
+    (lambda path: path.endswith("/selective"), {"selected_fields": ["title"]}),
+    (lambda path: path.endswith("/batch"), {"uris": ["test"]}),
+)
+
+# Values substituted for path parameters in the spec
+PLACEHOLDERS = {"uri": "test", "paper_id": "1"}
+PLACEHOLDER_RE = re.compile(r"\{(" + "|".join(PLACEHOLDERS) + r")\}")
+
+ENDPOINT_CASES = [
+    (path, method)
+    for path, operations in load_spec()["paths"].items()
+    for method in operations
+    if method in METHOD_CALLS
+]
+
+
+def request_body(path, operation):
+    if "requestBody" not in operation:
+        return {}
+    return next((body for matches, body in REQUEST_BODIES if matches(path)), {})
 
 
-def test_openapi_valid():
-    spec = load_spec()
+def test_openapi_valid(spec):
     assert "paths" in spec
     assert "/health" in spec["paths"]
 
 
-def test_endpoints_from_spec(app):
-    client = TestClient(app)
-    spec = load_spec()
-    for path, operations in spec["paths"].items():
-        for method in operations.keys():
-            url = path.replace("{uri}", "test").replace("{paper_id}", "1")
-            if method == "get":
-                response = client.get(url)
-            elif method == "post":
-                body = {}
-                if "requestBody" in operations[method]:
-                    if path.startswith("/pdfs") and method == "post":
-                        body = {"uri": "http://example.com/sample.pdf"}
-                    elif path.endswith("/selective"):
-                        body = {"selected_fields": ["title"]}
-                response = client.post(url, json=body)
-            elif method == "delete":
-                response = client.delete(url)
-            else:
-                continue
-            assert response.status_code < 500
-
-
-def test_selective_extraction(app):
-    client = TestClient(app)
+@pytest.mark.parametrize("path,method", ENDPOINT_CASES)
+def test_endpoints_from_spec(client, spec, path, method):
+    operation = spec["paths"][path][method]
+    url = PLACEHOLDER_RE.sub(lambda m: PLACEHOLDERS[m.group(1)], path)
+    response = METHOD_CALLS[method](client, url, request_body(path, operation))
+    assert response.status_code < 500
+
+
+def test_selective_extraction(client):
     payload = {
         "selected_fields": ["title", "abstract"],
         "selected_models": ["model1"],
@@ -168,3 +74,89 @@ def test_selective_extraction(app):
     response = client.post("/extract/1/selective", json=payload)
     assert response.status_code == 200
     assert response.json() == {"extracted": "uri1", "fields": ["title", "abstract"]}
+
+
+def test_list_endpoints_honor_etag(client):
+    for url in ("/pdfs", "/stats"):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+
+def test_list_pdfs_paginates(client):
+    response = client.get("/pdfs", params={"limit": 2, "offset": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert [pdf["id"] for pdf in data["pdfs"]] == [2, 3]
+    assert data["count"] == 2
+    assert data["total"] == 5
+
+    assert client.get("/pdfs", params={"limit": 0}).status_code == 422
+
+
+def test_pdf_summary_and_lookup_by_id(client):
+    response = client.get("/pdfs/summary", params={"converted": True})
+    assert response.status_code == 200
+    assert [pdf["id"] for pdf in response.json()["pdfs"]] == [0, 2, 4]
+
+    response = client.get("/pdfs/id/3")
+    assert response.status_code == 200
+    assert response.json()["uri"] == "uri3"
+
+
+def test_process_queue_streams_ndjson(client):
+    response = client.post("/convert/process-queue")
+    assert response.status_code == 200
+    assert response.json()["message"] == "Processed 2 PDFs"
+
+    headers = {"Accept": "application/x-ndjson"}
+    with client.stream("POST", "/convert/process-queue", headers=headers) as response:
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    assert sorted(line["uri"] for line in lines) == ["a", "b"]
+    assert not client.app.state.convert_pending
+
+    response = client.post("/extract/process-queue", headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[0])["message"] == "extracted"
+
+
+def test_convert_batch_queues_pending(client, monkeypatch):
+    ready = {"is_downloaded": True, "status": "success", "is_converted": False}
+    records = {
+        "new": {"uri": "new", **ready},
+        "done": {"uri": "done", **ready, "is_converted": True},
+        "busy": {"uri": "busy", **ready, "conversion_started_at": "2025-01-01 10:00:00"},
+        "retry": {"uri": "retry", **ready, "conversion_started_at": "2025-01-01 10:00:00", "conversion_error": "boom"},
+        "queued": {"uri": "queued", **ready},
+    }
+    monkeypatch.setattr(sys.modules["main"], "get_processed_pdf", records.get)
+    pending = client.app.state.convert_pending
+    # Hold the workers back so queued URIs stay pending for the whole test
+    monkeypatch.setattr(client.app.state, "convert_q", asyncio.Queue())
+    pending.add("queued")
+    try:
+        uris = ["new", "done", "busy", "retry", "queued", "missing", "new"]
+        data = client.post("/convert/batch", json={"uris": uris}).json()
+        assert data["queued"] == ["new", "retry"]
+        assert data["already_converted"] == ["done"]
+        assert data["in_progress"] == ["busy", "queued"]
+        assert [item["uri"] for item in data["rejected"]] == ["missing"]
+
+        # A repeated request does not queue the same PDFs twice
+        data = client.post("/convert/batch", json={"uris": ["new", "retry"]}).json()
+        assert data["queued"] == []
+        assert data["in_progress"] == ["new", "retry"]
+
+        # The single-PDF endpoint shares the same queue and pending set
+        assert client.post("/convert/new").json()["status"] == "in_progress"
+        assert client.post("/convert/busy").json()["status"] == "in_progress"
+        pending.clear()
+        assert client.post("/convert/new").json()["status"] == "queued"
+        assert "new" in pending
+        assert client.post("/convert/done").json()["message"] == "PDF is already converted"
+    finally:
+        pending.clear()
\ No newline at end of file
@@ -0,0 +1,231 @@
+import asyncio
+import importlib.util
+import sys
+import httpx
+import pytest
+
+
+def load_backend_module(name, monkeypatch):
+    # conftest stubs these modules for the API tests, so load the real
+    # files in their place for the duration of one test
+    spec = importlib.util.spec_from_file_location(name, f"fastapi_app/{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    config = load_backend_module("config", monkeypatch)
+    config.DATABASE_PATH = tmp_path / "test.db"
+    config.DATA_DIR = tmp_path / "data"
+    config.DATA_DIR.mkdir()
+    return config
+
+
+@pytest.fixture
+def database(config, monkeypatch):
+    database = load_backend_module("database", monkeypatch)
+    database.init_database()
+    yield database
+    database.flush_deferred_writes()
+    if database._CONNECTION is not None:
+        database._CONNECTION.close()
+
+
+def store_error(database, uri, message="failed"):
+    database.store_processed_pdf_deferred(
+        uri=uri, filename="", file_path="", file_size=0, error_message=message
+    )
+
+
+def test_deferred_writer_keeps_newest_processed_at(database, monkeypatch):
+    # Keep the error row queued until a newer success row has been stored
+    monkeypatch.setattr(database, "_ensure_writer", lambda: None)
+    store_error(database, "http://example.com/a.pdf")
+    database.store_processed_pdf(
+        uri="http://example.com/a.pdf", filename="a.pdf", file_path="a.pdf", file_size=10
+    )
+
+    database.flush_deferred_writes()
+    record = database.get_processed_pdf("http://example.com/a.pdf")
+    assert record["status"] == "success"
+    assert record["filename"] == "a.pdf"
+
+
+def test_flush_deferred_writes_drains_queue(database):
+    for i in range(3):
+        store_error(database, f"http://example.com/{i}.pdf", message=f"error {i}")
+
+    database.flush_deferred_writes()
+    assert database._WRITE_QUEUE.empty()
+    assert database._WRITER_THREAD is None
+    for i in range(3):
+        record = database.get_processed_pdf(f"http://example.com/{i}.pdf")
+        assert record["status"] == "error"
+        assert record["error_message"] == f"error {i}"
+
+
+def test_writes_invalidate_cached_record(database):
+    uri = "http://example.com/a.pdf"
+    database.store_processed_pdf(uri=uri, filename="a.pdf", file_path="a.pdf", file_size=10)
+    assert database.get_processed_pdf_cached(uri)["file_size"] == 10
+
+    database.store_processed_pdf(uri=uri, filename="a.pdf", file_path="a.pdf", file_size=20)
+    assert database.get_processed_pdf_cached(uri)["file_size"] == 20
+
+    database.update_conversion_status(uri, conversion_error="boom")
+    assert database.get_processed_pdf_cached(uri)["conversion_error"] == "boom"
+
+    database.delete_processed_pdf(uri)
+    assert database.get_processed_pdf_cached(uri) is None
+
+
+def test_delete_removes_record_and_files(database, tmp_path):
+    pdf_path = tmp_path / "a.pdf"
+    pdf_path.write_bytes(b"%PDF-1.7")
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "image_000.png").write_bytes(b"png")
+    uri = "http://example.com/a.pdf"
+    database.store_processed_pdf(uri=uri, filename="a.pdf", file_path=str(pdf_path), file_size=8)
+    database.update_conversion_status(uri, is_converted=True, images_folder_path=str(images))
+
+    assert database.delete_processed_pdf(uri)
+    assert database.get_processed_pdf(uri) is None
+    assert not pdf_path.exists()
+    assert not images.exists()
+    assert not database.delete_processed_pdf(uri)
+
+
+def test_pdfs_etag_changes_once_per_write(database):
+    uri = "http://example.com/a.pdf"
+    etags = [database.get_pdfs_etag()]
+    database.store_processed_pdf(uri=uri, filename="a.pdf", file_path="a.pdf", file_size=10)
+    etags.append(database.get_pdfs_etag())
+    database.update_conversion_status(uri, conversion_started=True)
+    etags.append(database.get_pdfs_etag())
+    database.delete_processed_pdf(uri)
+    etags.append(database.get_pdfs_etag())
+    assert len(set(etags)) == len(etags)
+
+    with database.get_db_connection() as conn:
+        version = conn.execute("SELECT version FROM processed_pdfs_version").fetchone()[0]
+    assert version == 3
+
+
+@pytest.fixture
+def processor(database, monkeypatch):
+    return load_backend_module("processor", monkeypatch)
+
+
+def test_filename_for_uri_is_stable(processor):
+    assert processor._filename_for_uri(
+        "http://example.com/papers/paper.pdf", "/papers/paper.pdf"
+    ) == "paper_75c452aae0e2d48b.pdf"
+    assert processor._filename_for_uri(
+        "http://example.com/download?id=7", "/download"
+    ) == "pdf_20134345b67ff0e6.pdf"
+    # Same basename on another host must not collide
+    assert processor._filename_for_uri(
+        "http://mirror.example.org/paper.pdf", "/paper.pdf"
+    ) != "paper_75c452aae0e2d48b.pdf"
+
+
+def run_with_transport(processor, monkeypatch, handler, *uris):
+    """Process each URI concurrently against a mocked HTTP server."""
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(processor, "_CLIENT", client)
+        try:
+            data = [processor.ProcessInputData(uri=uri) for uri in uris]
+            return await asyncio.gather(*(processor.process_pdf(item) for item in data))
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def pdf_server(requests, body=b"%PDF-1.7\n" + b"x" * 1024, head_headers=None, probe=None):
+    """Build a MockTransport handler that records requests and serves one PDF."""
+    async def stream(data):
+        await asyncio.sleep(0.05)
+        for start in range(0, len(data), 512):
+            yield data[start:start + 512]
+
+    def handler(request):
+        requests.append((request.method, request.headers.get("range")))
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"content-type": "application/pdf", **(head_headers or {})})
+        if request.headers.get("range") and probe is not None:
+            return httpx.Response(206, content=probe)
+        return httpx.Response(200, content=stream(body))
+
+    return handler
+
+
+def test_concurrent_process_pdf_shares_one_download(processor, monkeypatch):
+    requests = []
+    uri = "http://example.com/paper.pdf"
+    results = run_with_transport(processor, monkeypatch, pdf_server(requests), *[uri] * 5)
+
+    assert requests.count(("GET", None)) == 1
+    assert {result["database_id"] for result in results} == {results[0]["database_id"]}
+    assert results[0]["database_id"] is not None
+    assert not processor._INFLIGHT
+
+
+def test_advertised_size_over_limit_is_rejected(processor, database, config, monkeypatch):
+    monkeypatch.setattr(processor, "MAX_PDF_BYTES", 1000)
+    requests = []
+    uri = "http://example.com/big.pdf"
+    handler = pdf_server(requests, head_headers={"content-length": "5000"})
+    [result] = run_with_transport(processor, monkeypatch, handler, uri)
+
+    assert result["downloaded"] is False
+    assert "too large" in result["message"]
+    assert requests == [("HEAD", None)]
+    database.flush_deferred_writes()
+    assert database.get_processed_pdf(uri)["status"] == "error"
+
+
+def test_download_over_limit_is_discarded(processor, database, config, monkeypatch):
+    monkeypatch.setattr(processor, "MAX_PDF_BYTES", 1000)
+    monkeypatch.setattr(processor, "DOWNLOAD_CHUNK_SIZE", 512)
+    uri = "http://example.com/big.pdf"
+    # No Content-Length, so only the bytes received reveal the size
+    handler = pdf_server([], body=b"%PDF-1.7\n" + b"x" * 2000)
+    [result] = run_with_transport(processor, monkeypatch, handler, uri)
+
+    assert result["downloaded"] is False
+    assert "exceeded the limit" in result["message"]
+    assert list(config.DATA_DIR.iterdir()) == []
+    database.flush_deferred_writes()
+    record = database.get_processed_pdf(uri)
+    assert record["status"] == "error"
+    assert "exceeded the limit" in record["error_message"]
+
+
+def test_range_probe_without_pdf_magic_is_rejected(processor, database, monkeypatch):
+    requests = []
+    uri = "http://example.com/page.pdf"
+    handler = pdf_server(requests, head_headers={"accept-ranges": "bytes"}, probe=b"<html><b")
+    [result] = run_with_transport(processor, monkeypatch, handler, uri)
+
+    assert result["is_pdf"] is False
+    # Only the 8-byte probe was fetched, never the full body
+    assert requests == [("HEAD", None), ("GET", "bytes=0-7")]
+    database.flush_deferred_writes()
+    assert database.get_processed_pdf(uri)["status"] == "error"
+
+
+def test_non_pdf_body_is_never_written(processor, database, config, monkeypatch):
+    uri = "http://example.com/paper.pdf"
+    handler = pdf_server([], body=b"<html>Not found</html>")
+    [result] = run_with_transport(processor, monkeypatch, handler, uri)
+
+    assert result["is_pdf"] is False
+    assert list(config.DATA_DIR.iterdir()) == []
+    database.flush_deferred_writes()
+    assert database.get_processed_pdf(uri)["status"] == "error"